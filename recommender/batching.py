@@ -0,0 +1,123 @@
+"""
+Dynamic micro-batching for CPU-bound inference.
+
+Handlers on the event loop submit single items and await the result.
+Worker threads drain the queue, collecting up to `max_batch_size` items
+or waiting at most `max_wait_ms` after the first one, and run a single
+batched call for the whole group. The event loop never runs model code.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Queue-fed scheduler that turns concurrent single-item calls into batches.
+
+    `batch_fn(items)` must return one result per item, in order. Returning
+    an Exception instance for an item fails only that item's caller; raising
+    fails the whole batch.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=2.0, workers=1, name='batcher'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.workers = max(1, int(workers))
+        self.name = name
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def start(self):
+        """Start the worker threads (idempotent; also called lazily on first submit)"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    async def submit(self, item):
+        """Queue one item and wait for its result without blocking the event loop"""
+        if not self._threads:
+            self.start()
+        future = concurrent.futures.Future()
+        self._queue.put((item, future))
+        return await asyncio.wrap_future(future)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            stop_after = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop_after = True
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+            if stop_after:
+                return
+
+    def _dispatch(self, batch):
+        # Skip callers that went away (e.g. client disconnects) before we started
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(batch)} failed: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0
+        }
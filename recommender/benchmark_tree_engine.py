@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled tree evaluator against sklearn's predict_proba.
+
+Loads compatibility_model.joblib, scores random feature rows at several
+batch sizes with both paths, and reports per-call latency and the largest
+difference between the two sets of probabilities.
+
+Usage: python benchmark_tree_engine.py [--model compatibility_model.joblib] [--repeats 200]
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+from tree_engine import CompiledTreeEnsemble
+
+
+def time_call(fn, X, repeats):
+    """Median wall time of fn(X) in microseconds"""
+    fn(X)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='compatibility_model.joblib')
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 128, 256, 1024])
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    started = time.perf_counter()
+    engine = CompiledTreeEnsemble(model)
+    print(f"Compiled {engine.n_trees} trees ({engine.feature.shape[0]} nodes, depth {engine.max_depth}) "
+          f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    rng = np.random.default_rng(42)
+    print(f"{'batch':>6} {'sklearn us':>12} {'compiled us':>12} {'speedup':>8} {'max abs diff':>14} {'identical':>10}")
+    for batch_size in args.batch_sizes:
+        X = rng.random((batch_size, engine.n_features_in_), dtype=np.float32)
+        expected = model.predict_proba(X)
+        actual = engine.predict_proba(X)
+        sklearn_us = time_call(model.predict_proba, X, args.repeats)
+        compiled_us = time_call(engine.predict_proba, X, args.repeats)
+        print(f"{batch_size:>6} {sklearn_us:>12.1f} {compiled_us:>12.1f} {sklearn_us / compiled_us:>7.1f}x "
+              f"{np.abs(expected - actual).max():>14.3e} {str(np.array_equal(expected, actual)):>10}")
+
+if __name__ == "__main__":
+    main()
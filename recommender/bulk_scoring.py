@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Bulk compatibility scoring of NDJSON investor/startup pairs.
+
+Each input line is {"id": ..., "investor": {...}, "startup": {...}} (id is
+optional). Lines are read incrementally and scored in fixed-size chunks:
+one TF-IDF transform per chunk for the investors and one for the
+startups, and one model call. Results are written as NDJSON, one line per
+input line and in input order, as soon as each chunk is done, so memory
+stays bounded by the chunk size whatever the size of the input.
+
+Used by /predict_compatibility_bulk/ and as a standalone CLI:
+
+Usage: python bulk_scoring.py pairs.ndjson [-o scores.ndjson] [--model-dir .] [--chunk-size 1024]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from feature_cache import canonical_key
+from features import INVESTOR_FEATURES, vectorize_startups
+from model_registry import ModelSet
+from schemas import InvestorInput, StartupInput
+from sparse_features import sparse_investor_rows
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def parse_pair(line, index):
+    """(index, id, investor, startup) for a valid line, or an error result dict.
+
+    The error result carries the line's id too when the line is a JSON object with one.
+    """
+    record = None
+    try:
+        record = json.loads(line)
+        return index, record.get('id'), InvestorInput(**record['investor']), StartupInput(**record['startup'])
+    except Exception as e:
+        result = {"line": index}
+        if isinstance(record, dict) and record.get('id') is not None:
+            result["id"] = record['id']
+        result["error"] = f"Invalid pair: {str(e)}"
+        return result
+
+def iter_chunks(lines, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Group non-empty lines into lists of parsed pairs / error results"""
+    chunk = []
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        chunk.append(parse_pair(line, index))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def score_chunk(chunk, models):
+    """Result dicts for one chunk, in order; invalid lines and NaN rows carry an error"""
+    pairs = [entry for entry in chunk if isinstance(entry, tuple)]
+    scores = {}
+    if pairs:
+        # Investors repeat a lot in pair files, so each distinct one is vectorized once
+        investor_rows, unique_investors, pair_investor_rows = {}, [], []
+        for _, _, investor, _ in pairs:
+            key = canonical_key(investor)
+            if key not in investor_rows:
+                investor_rows[key] = len(unique_investors)
+                unique_investors.append(investor)
+            pair_investor_rows.append(investor_rows[key])
+        investor_mat = sparse_investor_rows(unique_investors, models).toarray()
+        startup_mat_compat, _ = vectorize_startups([startup for _, _, _, startup in pairs], models)
+
+        combined_mat = np.empty((len(pairs), models.compat_features), dtype=np.float32)
+        combined_mat[:, :INVESTOR_FEATURES] = investor_mat[pair_investor_rows]
+        combined_mat[:, INVESTOR_FEATURES:] = startup_mat_compat
+
+        valid = ~np.isnan(combined_mat).any(axis=1)
+        pair_scores = np.full(len(pairs), np.nan)
+        if valid.any():
+            pair_scores[valid] = models.compat_proba(combined_mat[valid])
+        scores = {pair[0]: score for pair, score in zip(pairs, pair_scores)}
+
+    results = []
+    for entry in chunk:
+        if not isinstance(entry, tuple):
+            results.append(entry)
+            continue
+        index, pair_id, _, _ = entry
+        result = {"line": index}
+        if pair_id is not None:
+            result["id"] = pair_id
+        if np.isnan(scores[index]):
+            result["error"] = "Invalid input values detected"
+        else:
+            result["compatibility_score"] = float(scores[index])
+        results.append(result)
+    return results
+
+def results_to_ndjson(results):
+    return ''.join(json.dumps(result) + '\n' for result in results)
+
+def score_lines(lines, models, chunk_size=DEFAULT_CHUNK_SIZE):
+    """NDJSON output text per chunk for an iterable of NDJSON input lines"""
+    for chunk in iter_chunks(lines, chunk_size):
+        yield results_to_ndjson(score_chunk(chunk, models))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', nargs='?', default='-', help="NDJSON pairs file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="NDJSON results file ('-' for stdout)")
+    parser.add_argument('--model-dir', default='.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    models = ModelSet.load(args.model_dir)
+    source = sys.stdin if args.input == '-' else open(args.input, 'r')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w')
+    started = time.perf_counter()
+    lines = 0
+    try:
+        for text in score_lines(source, models, args.chunk_size):
+            sink.write(text)
+            lines += text.count('\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - started
+    print(f"Scored {lines} pairs in {elapsed:.1f}s ({lines / max(elapsed, 1e-9):.0f} pairs/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+In-memory startup catalog for top-K retrieval.
+
+Startup vectors live in contiguous float32 matrices so a first-pass
+similarity search over the whole catalog is a single matrix-vector product.
+Named projections of the compat rows (e.g. the distilled surrogate's
+startup projection) are computed once per upsert and kept alongside.
+The input each row was vectorized from is kept too, so a catalog built
+for new models can take the rows over (see entries_since()).
+"""
+
+import threading
+
+import numpy as np
+
+
+def normalize_rows(matrix):
+    """L2-normalize each row; all-zero rows are left as zeros"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def top_rows(matrix, query, n_candidates):
+    """(rows, scores) of the n_candidates largest matrix @ query values, best first"""
+    size = matrix.shape[0]
+    if size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    scores = matrix @ query
+
+    n_candidates = min(n_candidates, size)
+    if n_candidates < size:
+        rows = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+    else:
+        rows = np.arange(size)
+    rows = rows[np.argsort(-scores[rows], kind="stable")]
+    return rows, scores[rows]
+
+
+class StartupCatalog:
+    """Contiguous store of startup compat vectors plus a normalized search index"""
+
+    def __init__(self, compat_width, index_width, initial_capacity=1024, projections=None):
+        """`projections` maps a name to (function of compat rows -> (rows, width) matrix, width)"""
+        self.compat_width = compat_width
+        self.index_width = index_width
+        self.projections = dict(projections or {})
+        self._compat = np.zeros((initial_capacity, compat_width), dtype=np.float32)
+        self._index = np.zeros((initial_capacity, index_width), dtype=np.float32)
+        self._projected = {
+            name: np.zeros((initial_capacity, width), dtype=np.float32) for name, (_, width) in self.projections.items()
+        }
+        self._ids = []
+        self._rows = {}
+        self._records = {}
+        self._updated = {}  # id -> value of _sequence when its row was last written
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _grow(self, capacity):
+        compat = np.zeros((capacity, self.compat_width), dtype=np.float32)
+        index = np.zeros((capacity, self.index_width), dtype=np.float32)
+        compat[:len(self._ids)] = self._compat[:len(self._ids)]
+        index[:len(self._ids)] = self._index[:len(self._ids)]
+        for name, rows in self._projected.items():
+            projected = np.zeros((capacity, rows.shape[1]), dtype=np.float32)
+            projected[:len(self._ids)] = rows[:len(self._ids)]
+            self._projected[name] = projected
+        self._compat, self._index = compat, index
+
+    def upsert(self, ids, compat_rows, index_rows, records):
+        """Insert new startups or overwrite existing ones by id; `records` are their inputs"""
+        index_rows = normalize_rows(np.asarray(index_rows, dtype=np.float32))
+        projected_rows = {name: project(compat_rows) for name, (project, _) in self.projections.items()}
+        with self._lock:
+            new_ids = [startup_id for startup_id in dict.fromkeys(ids) if startup_id not in self._rows]
+            needed = len(self._ids) + len(new_ids)
+            if needed > self._compat.shape[0]:
+                self._grow(max(needed, 2 * self._compat.shape[0]))
+            for startup_id in new_ids:
+                self._rows[startup_id] = len(self._ids)
+                self._ids.append(startup_id)
+            rows = [self._rows[startup_id] for startup_id in ids]
+            self._compat[rows] = compat_rows
+            self._index[rows] = index_rows
+            for name, values in projected_rows.items():
+                self._projected[name][rows] = values
+            self._sequence += 1
+            for startup_id, record in zip(ids, records):
+                self._records[startup_id] = record
+                self._updated[startup_id] = self._sequence
+            return len(new_ids)
+
+    def entries_since(self, sequence=0):
+        """(ids, records, compat rows, index rows, sequence) of the startups written after `sequence`.
+
+        Pass the returned sequence to a later call to get only what was upserted in between.
+        """
+        with self._lock:
+            ids = [startup_id for startup_id in self._ids if self._updated[startup_id] > sequence]
+            rows = [self._rows[startup_id] for startup_id in ids]
+            return (ids, [self._records[startup_id] for startup_id in ids],
+                    self._compat[rows], self._index[rows], self._sequence)
+
+    def clear(self):
+        with self._lock:
+            self._ids = []
+            self._rows = {}
+            self._records = {}
+            self._updated = {}
+
+    def search(self, query, n_candidates):
+        """First-pass cosine search; returns (rows, similarities) best first"""
+        with self._lock:
+            index = self._index[:len(self._ids)]
+        norm = np.linalg.norm(query)
+        query = (query / norm if norm > 0 else query).astype(np.float32)
+        return top_rows(index, query, n_candidates)
+
+    def projected_search(self, name, weights, n_candidates):
+        """First pass over one projection; returns (rows, projected @ weights) best first"""
+        return top_rows(self.projected_rows(name), weights.astype(np.float32), n_candidates)
+
+    def projected_rows(self, name):
+        """Projection `name` of every catalog row, in row order"""
+        with self._lock:
+            return self._projected[name][:len(self._ids)]
+
+    def compat_rows(self, rows):
+        with self._lock:
+            return self._compat[rows]
+
+    def ids_for(self, rows):
+        with self._lock:
+            return [self._ids[row] for row in rows]
@@ -0,0 +1,259 @@
+"""
+Registered investors and startups, stored as preprocessed feature vectors.
+
+Each store keeps one float32 row per entity in a memory-mapped file,
+so scoring by ID is a row lookup instead of re-vectorizing the
+thesis or description. Files per store in the store directory:
+
+- `<name>.log.ndjson`: append-only log of registered inputs (last write per ID wins),
+  followed through shared_log.SharedLog
+- `<name>.<version>.f32`: the vectors, rows in order of first registration
+- `<name>.<version>.meta.json`: feature version, width, row count and how
+  far into the log the vectors are up to date
+
+Vectors depend on the vectorizers and feature widths, so each feature
+version has its own vector and meta files, built from the logged inputs
+the first time that version is opened. Every log entry records the
+feature version it was vectorized with. Before reading or writing, a
+store replays the log lines it has not seen yet under the log's lock and
+re-vectorizes the entries written with another version. So the store a
+reload opens picks up what the previous ModelSet's store registered while
+the new models were warming up, and the log can be compacted while other
+stores follow it. Files of earlier versions are left in place.
+
+The vectors are flushed and the meta rewritten only every
+META_FLUSH_ROWS upserted rows, after opening and in flush(): rows
+written since are re-vectorized from the log by the next open.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from shared_log import SharedLog
+
+logger = logging.getLogger(__name__)
+
+# Rewrite the input log once it holds this many times more lines than entities
+LOG_COMPACT_RATIO = 2
+REBUILD_CHUNK_SIZE = 1024
+# Upserted rows between two flushes of the vectors file and meta
+META_FLUSH_ROWS = 4096
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+class EntityStore:
+    """Memory-mapped vector store keyed by entity ID.
+
+    `vectorize(records)` turns a list of logged input dicts into a
+    (len(records), width) float32 matrix; it is used to rebuild the store.
+    """
+
+    def __init__(self, directory, name, width, feature_version, vectorize, initial_capacity=1024):
+        self.directory = directory
+        self.name = name
+        self.width = width
+        self.feature_version = feature_version
+        self.vectorize = vectorize
+        version_tag = re.sub(r'[^A-Za-z0-9_.-]', '-', str(feature_version))
+        self._vectors_path = os.path.join(directory, f"{name}.{version_tag}.f32")
+        self._meta_path = os.path.join(directory, f"{name}.{version_tag}.meta.json")
+        self._lock = threading.Lock()
+        self._ids = []
+        self._rows = {}
+        self._records = {}
+        self._versions = {}  # feature version each entity was last vectorized with
+        self._unflushed = 0  # rows upserted since the meta was last written
+        os.makedirs(directory, exist_ok=True)
+        self._log = SharedLog(os.path.join(directory, f"{name}.log.ndjson"))
+        with self._lock, self._log.locked():
+            self._open(initial_capacity)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, entity_id):
+        return entity_id in self._rows
+
+    def _apply(self, entries):
+        """Add log entries to the index; returns the ids they touched, in order"""
+        touched = []
+        for entry in entries:
+            entity_id = entry['id']
+            if entity_id not in self._rows:
+                self._rows[entity_id] = len(self._ids)
+                self._ids.append(entity_id)
+            self._records[entity_id] = entry['data']
+            self._versions[entity_id] = entry.get('version')
+            touched.append(entity_id)
+        return touched
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _open(self, initial_capacity):
+        meta = self._read_meta()
+        try:
+            log_inode = os.stat(self._log.path).st_ino
+        except FileNotFoundError:
+            log_inode = None
+        reusable = (
+            meta.get('feature_version') == self.feature_version
+            and meta.get('width') == self.width
+            and meta.get('log_inode') == log_inode
+            and os.path.exists(self._vectors_path)
+        )
+        # Entries up to the meta's log offset are in the vectors file; the
+        # rest are re-vectorized, whoever wrote them
+        if reusable:
+            up_to_date, _ = self._log.read_new(end=meta.get('log_offset', 0))
+            self._apply(up_to_date)
+        entries, _ = self._log.read_new()
+        stale = list(dict.fromkeys(self._apply(entries)))
+        log_lines = len(entries) + (len(up_to_date) if reusable else 0)
+
+        if reusable:
+            file_rows = os.path.getsize(self._vectors_path) // (4 * self.width)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(file_rows, self.width))
+            self._ensure_capacity(len(self._ids))
+            self._revectorize(stale)
+        else:
+            capacity = max(initial_capacity, len(self._ids))
+            # Rebuilt next to the file and swapped in whole, so an
+            # interrupted rebuild never leaves a partial vectors file
+            tmp_path = f"{self._vectors_path}.{os.getpid()}.tmp"
+            self._vectors = np.memmap(tmp_path, dtype=np.float32, mode='w+', shape=(capacity, self.width))
+            self._revectorize(self._ids)
+            self._vectors.flush()
+            os.replace(tmp_path, self._vectors_path)
+        if log_lines > LOG_COMPACT_RATIO * max(len(self._ids), 1):
+            self._compact_log()
+        self._write_meta()
+
+    def _revectorize(self, ids):
+        if not ids:
+            return
+        logger.info(f"{self.name}: vectorizing {len(ids)} logged entities for feature version {self.feature_version}")
+        for start in range(0, len(ids), REBUILD_CHUNK_SIZE):
+            chunk = ids[start:start + REBUILD_CHUNK_SIZE]
+            self._vectors[[self._rows[i] for i in chunk]] = self.vectorize([self._records[i] for i in chunk])
+            for entity_id in chunk:
+                self._versions[entity_id] = self.feature_version
+
+    def _write_meta(self):
+        self._unflushed = 0
+        self._vectors.flush()
+        _write_json_atomic(self._meta_path, {
+            "feature_version": self.feature_version,
+            "width": self.width,
+            "count": len(self._ids),
+            "log_inode": self._log.inode,
+            "log_offset": self._log.offset
+        })
+
+    def _compact_log(self):
+        # Entities keep their first-registration order, so every follower
+        # assigns the same rows when it re-reads the compacted log
+        self._log.rewrite([
+            {"id": entity_id, "data": self._records[entity_id], "version": self._versions[entity_id]}
+            for entity_id in self._ids
+        ])
+
+    def _ensure_capacity(self, needed):
+        """Grow the vectors file to at least `needed` rows; never shrinks it (another process may use the rows)"""
+        capacity = self._vectors.shape[0]
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity)
+        file_rows = os.path.getsize(self._vectors_path) // (4 * self.width)
+        capacity = max(capacity, file_rows)  # another process may have grown it
+        if capacity == self._vectors.shape[0]:
+            return
+        self._vectors.flush()
+        del self._vectors
+        if capacity > file_rows:
+            with open(self._vectors_path, 'r+b') as f:
+                f.truncate(capacity * self.width * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.width))
+
+    def _catch_up(self):
+        """Index the log lines other stores appended; call with both locks held"""
+        entries, restarted = self._log.read_new()
+        if restarted:
+            # Compacted by another store: same rows, records re-read from the start
+            self._ids, self._rows, self._records, self._versions = [], {}, {}, {}
+            self._apply(entries)
+            stale = [i for i in self._ids if self._versions[i] != self.feature_version]
+        else:
+            stale = [i for i in dict.fromkeys(self._apply(entries)) if self._versions[i] != self.feature_version]
+        self._ensure_capacity(len(self._ids))
+        self._revectorize(stale)
+
+    def _refresh(self):
+        if self._log.changed():
+            with self._log.locked():
+                self._catch_up()
+
+    def upsert(self, ids, records, vectors):
+        """Register new entities or overwrite existing ones; only their rows change"""
+        with self._lock, self._log.locked():
+            self._catch_up()
+            added = len([entity_id for entity_id in dict.fromkeys(ids) if entity_id not in self._rows])
+            entries = [{"id": entity_id, "data": record, "version": self.feature_version}
+                       for entity_id, record in zip(ids, records)]
+            self._apply(entries)
+            self._ensure_capacity(len(self._ids))
+            # Vectors first: a store that reads the log line finds its row written
+            self._vectors[[self._rows[entity_id] for entity_id in ids]] = vectors
+            self._log.append(entries)
+            self._unflushed += len(entries)
+            if self._unflushed >= META_FLUSH_ROWS:
+                self._write_meta()
+            return added
+
+    def flush(self):
+        """Write the vectors and meta now, e.g. at shutdown, so the next open re-vectorizes nothing"""
+        with self._lock, self._log.locked():
+            self._catch_up()
+            self._write_meta()
+
+    def lookup(self, ids):
+        """(vectors of the known ids in order, boolean mask of which ids are known)"""
+        with self._lock:
+            self._refresh()
+            known = np.array([entity_id in self._rows for entity_id in ids], dtype=bool)
+            rows = [self._rows[entity_id] for entity_id in ids if entity_id in self._rows]
+            return np.array(self._vectors[rows]), known
+
+    def ids(self):
+        """All registered ids in row order"""
+        with self._lock:
+            self._refresh()
+            return list(self._ids)
+
+    def record(self, entity_id):
+        """Last registered input for an id, or None"""
+        with self._lock:
+            self._refresh()
+            return self._records.get(entity_id)
+
+    def stats(self):
+        return {
+            "count": len(self._ids),
+            "capacity": self._vectors.shape[0],
+            "width": self.width,
+            "feature_version": self.feature_version
+        }
@@ -0,0 +1,206 @@
+"""
+Per-feature contributions (TreeSHAP) for the compatibility and traction models.
+
+The compatibility GradientBoostingClassifier is explained with exact
+path-dependent TreeSHAP in log-odds space. Each depth-3 tree uses at
+most 7 distinct features, so the Shapley value is computed by evaluating
+the tree's expectation for every subset of its own features at once with
+NumPy, using the training cover of each node as the background. All the
+background-dependent parts (paths, cover fractions, subset masks and
+Shapley weights) are built once per ModelSet. The XGBoost traction model
+uses XGBoost's own TreeSHAP (pred_contribs).
+
+Contributions are grouped back into the feature blocks of features.py.
+"""
+
+from math import factorial
+
+import numpy as np
+
+from features import (
+    INVESTOR_FEATURES,
+    INVESTOR_TYPES,
+    SECTORS,
+    STAGES,
+    TEXT_FEATURES
+)
+
+# Subset enumeration is exponential in the features of a single tree
+MAX_TREE_FEATURES = 12
+# Contributions and block totals this close to zero are float round-off
+# (e.g. a block whose features cancel out) and are reported as zero
+ZERO_ATOL = 1e-12
+
+INVESTOR_NUMERIC = ['avg_check_size', 'min_roi', 'risk_appetite', 'years_active', 'total_investments']
+STARTUP_NUMERIC = ['employees', 'mrr', 'growth_rate', 'burn_rate', 'funding_to_date', 'last_valuation']
+
+
+class _TreeTables:
+    """Root-to-leaf paths of one tree, padded to the tree depth"""
+
+    def __init__(self, tree):
+        left, right = tree.children_left, tree.children_right
+        cover = tree.weighted_n_node_samples
+        features = sorted({int(f) for f, l in zip(tree.feature, left) if l != -1})
+        if len(features) > MAX_TREE_FEATURES:
+            raise ValueError(f"Tree uses {len(features)} features, more than {MAX_TREE_FEATURES}")
+        local = {feature: i for i, feature in enumerate(features)}
+        self.features = np.array(features, dtype=np.intp)
+
+        paths = []  # (leaf, [(node, went_left), ...])
+        stack = [(0, [])]
+        while stack:
+            node, path = stack.pop()
+            if left[node] == -1:
+                paths.append((node, path))
+                continue
+            stack.append((right[node], path + [(node, False)]))
+            stack.append((left[node], path + [(node, True)]))
+
+        depth = max(1, max(len(path) for _, path in paths))
+        n_leaves = len(paths)
+        self.path_feature = np.zeros((n_leaves, depth), dtype=np.intp)
+        self.path_local = np.zeros((n_leaves, depth), dtype=np.intp)
+        self.path_threshold = np.full((n_leaves, depth), np.inf)
+        self.path_left = np.ones((n_leaves, depth), dtype=bool)
+        self.path_fraction = np.ones((n_leaves, depth))
+        self.path_valid = np.zeros((n_leaves, depth), dtype=bool)
+        self.leaf_value = np.zeros(n_leaves)
+        for row, (leaf, path) in enumerate(paths):
+            self.leaf_value[row] = tree.value[leaf, 0, 0]
+            for col, (node, went_left) in enumerate(path):
+                child = left[node] if went_left else right[node]
+                self.path_feature[row, col] = tree.feature[node]
+                self.path_local[row, col] = local[int(tree.feature[node])]
+                self.path_threshold[row, col] = tree.threshold[node]
+                self.path_left[row, col] = went_left
+                self.path_fraction[row, col] = cover[child] / cover[node]
+                self.path_valid[row, col] = True
+
+        # Subsets of the tree's features as bitmasks, and for each feature
+        # the subsets without it with their Shapley weights
+        m = len(features)
+        masks = np.arange(2 ** m)
+        self.mask_bits = ((masks[:, None] >> np.arange(max(m, 1))) & 1).astype(bool)[:, :m]
+        sizes = self.mask_bits.sum(axis=1)
+        weights = np.array([factorial(s) * factorial(m - s - 1) / factorial(m) for s in range(m)])
+        self.without = [masks[~self.mask_bits[:, i]] for i in range(m)]
+        self.with_feature = [without | (1 << i) for i, without in enumerate(self.without)]
+        self.weights = [weights[sizes[without]] for without in self.without]
+
+    def expectations(self, X):
+        """Expected tree output given each subset of the tree's features, shape (rows, 2**m)"""
+        goes_left = X[:, self.path_feature] <= self.path_threshold  # (rows, leaves, depth)
+        follows = goes_left == self.path_left
+        in_subset = self.mask_bits[:, self.path_local]  # (subsets, leaves, depth)
+        factors = np.where(in_subset[None], follows[:, None], self.path_fraction[None, None])
+        factors = np.where(self.path_valid, factors, 1.0)
+        return (factors.prod(axis=3) * self.leaf_value).sum(axis=2)
+
+    def shap_values(self, X):
+        """Contributions of the tree's own features, shape (rows, m)"""
+        expectations = self.expectations(X)
+        phi = np.empty((X.shape[0], len(self.features)))
+        for i in range(len(self.features)):
+            phi[:, i] = (expectations[:, self.with_feature[i]] - expectations[:, self.without[i]]) @ self.weights[i]
+        return phi
+
+
+class TreeShapExplainer:
+    """Exact path-dependent TreeSHAP for a binary GradientBoostingClassifier, in log-odds"""
+
+    def __init__(self, model):
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None or estimators.shape[1] != 1:
+            raise ValueError("Only fitted binary gradient boosting classifiers can be explained")
+        self.n_features_in_ = int(model.n_features_in_)
+        self.learning_rate = float(model.learning_rate)
+        self.trees = [_TreeTables(estimator.tree_) for estimator in estimators[:, 0]]
+        init_raw = float(model._raw_predict_init(np.zeros((1, self.n_features_in_), dtype=np.float32))[0, 0])
+        self.expected_value = init_raw + self.learning_rate * sum(
+            float(tree.leaf_value @ np.prod(np.where(tree.path_valid, tree.path_fraction, 1.0), axis=1))
+            for tree in self.trees
+        )
+
+    def shap_values(self, X):
+        """(rows, n_features) contributions; each row sums to decision_function - expected_value"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        phi = np.zeros((X.shape[0], self.n_features_in_))
+        for tree in self.trees:
+            if len(tree.features):
+                phi[:, tree.features] += self.learning_rate * tree.shap_values(X)
+        return phi
+
+
+def traction_shap_values(traction_model, X):
+    """XGBoost's TreeSHAP for the traction model: (contributions, expected value per row)"""
+    import xgboost
+
+    contribs = traction_model.get_booster().predict(xgboost.DMatrix(np.asarray(X, dtype=np.float32)), pred_contribs=True)
+    return contribs[:, :-1], contribs[:, -1]
+
+
+def _text_terms(vectorizer):
+    """Term of each of the TEXT_FEATURES text columns (vectorize_* pads short vocabularies)"""
+    terms = [str(term) for term in vectorizer.get_feature_names_out()][:TEXT_FEATURES]
+    return terms + [f"<unused {i}>" for i in range(len(terms), TEXT_FEATURES)]
+
+def _startup_layout(width, prefix, models):
+    terms = _text_terms(models.description_vectorizer)
+    names = (
+        [f"{prefix}{name}" for name in STARTUP_NUMERIC]
+        + [f"{prefix}sector:{sector}" for sector in SECTORS]
+        + [f"{prefix}stage:{stage}" for stage in STAGES]
+        + [f"{prefix}description:{term}" for term in terms]
+    )
+    blocks = (
+        ['startup_numeric'] * len(STARTUP_NUMERIC) + ['startup_sector'] * len(SECTORS)
+        + ['startup_stage'] * len(STAGES) + ['description_terms'] * len(terms)
+    )
+    names += [f"{prefix}padding_{i}" for i in range(len(names), width)]
+    blocks += ['startup_other'] * (width - len(blocks))
+    return names[:width], blocks[:width]
+
+def compat_feature_layout(models):
+    """Feature names and block labels for the compatibility model's columns"""
+    terms = _text_terms(models.thesis_vectorizer)
+    types = sorted(INVESTOR_TYPES, key=INVESTOR_TYPES.get)
+    names = (
+        [f"investor.{name}" for name in INVESTOR_NUMERIC]
+        + [f"investor.type:{investor_type}" for investor_type in types]
+        + [f"investor.sector:{sector}" for sector in SECTORS]
+        + [f"investor.stage:{stage}" for stage in STAGES]
+        + [f"investor.thesis:{term}" for term in terms]
+    )
+    blocks = (
+        ['investor_numeric'] * len(INVESTOR_NUMERIC) + ['investor_type'] * len(types)
+        + ['investor_sector'] * len(SECTORS) + ['investor_stage'] * len(STAGES) + ['thesis_terms'] * len(terms)
+    )
+    names += [f"investor.padding_{i}" for i in range(len(names), INVESTOR_FEATURES)]
+    blocks += ['investor_other'] * (INVESTOR_FEATURES - len(blocks))
+    startup_names, startup_blocks = _startup_layout(models.startup_compat_features, 'startup.', models)
+    return np.array(names + startup_names), np.array(blocks + startup_blocks)
+
+def traction_feature_layout(models):
+    names, blocks = _startup_layout(models.traction_features, '', models)
+    return np.array(names), np.array(blocks)
+
+def summarize(contributions, expected_value, layout, top_n=10):
+    """Block totals (largest first) and the strongest individual features for one row of contributions"""
+    names, blocks = layout
+    contributions = np.where(np.isclose(contributions, 0.0, atol=ZERO_ATOL), 0.0, contributions)
+    block_names, block_index = np.unique(blocks, return_inverse=True)
+    block_totals = np.bincount(block_index, weights=contributions, minlength=len(block_names))
+    block_totals[np.isclose(block_totals, 0.0, atol=ZERO_ATOL)] = 0.0
+    block_order = np.argsort(-np.abs(block_totals), kind='stable')
+    top = np.argsort(-np.abs(contributions), kind='stable')[:top_n]
+    return {
+        "expected_value": float(expected_value),
+        "blocks": {str(block_names[i]): float(block_totals[i]) for i in block_order if block_totals[i] != 0.0},
+        "top_features": [
+            {"feature": str(names[i]), "block": str(blocks[i]), "contribution": float(contributions[i])}
+            for i in top if contributions[i] != 0.0
+        ]
+    }
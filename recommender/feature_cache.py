@@ -0,0 +1,77 @@
+"""
+Bounded LRU cache for preprocessed feature vectors.
+
+Entries are keyed by a canonical hash of the pydantic input, so the same
+investor or startup sent by different callers maps to the same entry.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(data, namespace=""):
+    """Stable content hash of a pydantic model (field order does not matter)"""
+    payload = json.dumps(data.model_dump(), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(f"{namespace}|{payload}".encode("utf-8")).hexdigest()
+
+
+class FeatureCache:
+    """Thread-safe LRU cache with size and TTL eviction and hit/miss counters"""
+
+    def __init__(self, max_size=10000, ttl_seconds=3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss or expired entry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < now:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,205 @@
+"""
+Feature layout and vectorizers for the recommender models.
+
+Every function takes the active ModelSet so that a request is vectorized
+with the same TF-IDF vocabularies and feature widths as the models that
+score it.
+"""
+
+import logging
+
+import numpy as np
+
+from request_logging import NULL_TIMER
+from schemas import InvestorInput, StartupInput
+
+logger = logging.getLogger(__name__)
+
+# Define global constants
+SECTORS = ['Tech', 'Healthcare', 'Fintech', 'Consumer', 'Enterprise', 'AI/ML', 'CleanTech']
+STAGES = ['Pre-seed', 'Seed', 'Series A', 'Series B', 'Growth']
+INVESTOR_TYPES = {"VC": 0, "Angel": 1, "Corporate": 2, "PE": 3}
+SECTOR_INDEX = {sector: i for i, sector in enumerate(SECTORS)}
+STAGE_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+
+# Calculate investor and startup feature dimensions based on model expectations
+# Assuming compatibility model expects investor + startup features
+INVESTOR_FEATURES = 250  # Based on your original setup
+TEXT_FEATURES = 50  # TF-IDF max_features used in train_model.py
+
+# Column layout used by the catalog search index: the investor's sector/stage
+# preferences and thesis terms are matched against the startup's sector/stage
+# one-hots and description terms
+INVESTOR_SECTOR_SLICE = slice(9, 9 + len(SECTORS))
+INVESTOR_STAGE_SLICE = slice(INVESTOR_SECTOR_SLICE.stop, INVESTOR_SECTOR_SLICE.stop + len(STAGES))
+INVESTOR_THESIS_SLICE = slice(INVESTOR_STAGE_SLICE.stop, INVESTOR_STAGE_SLICE.stop + TEXT_FEATURES)
+STARTUP_INDEX_SLICE = slice(6, 6 + len(SECTORS) + len(STAGES) + TEXT_FEATURES)
+INDEX_FEATURES = STARTUP_INDEX_SLICE.stop - STARTUP_INDEX_SLICE.start
+
+
+def fit_width(matrix, width):
+    """Pad with zeros or truncate the columns of a 2-D feature matrix to `width`"""
+    if matrix.shape[1] < width:
+        return np.pad(matrix, ((0, 0), (0, width - matrix.shape[1])), 'constant')
+    return matrix[:, :width]
+
+def vectorize_investor(investor_data, models, timer=NULL_TIMER):
+    """Build the fixed-size investor feature vector"""
+    # Numeric features
+    investor_numeric = np.array([
+        investor_data.avg_check_size,
+        investor_data.min_roi,
+        investor_data.risk_appetite,
+        investor_data.years_active,
+        investor_data.total_investments
+    ], dtype=np.float32)
+
+    # Transform thesis text
+    with timer.stage('vectorize'):
+        thesis_vec = models.thesis_vectorizer.transform([investor_data.thesis]).toarray()
+    if thesis_vec.shape[1] != TEXT_FEATURES:  # Adjust based on your TF-IDF vectorizer's max_features
+        logger.warning(f"Unexpected thesis vector shape: {thesis_vec.shape}")
+        thesis_vec = np.pad(thesis_vec, ((0, 0), (0, TEXT_FEATURES - thesis_vec.shape[1])), 'constant')
+
+    # One-hot encoding for type
+    investor_type_vec = np.zeros(4, dtype=np.float32)
+    if investor_data.type.upper() in INVESTOR_TYPES:
+        investor_type_vec[INVESTOR_TYPES[investor_data.type.upper()]] = 1
+
+    # Sector and stage preferences (fixed size vectors)
+    sector_vec = np.zeros(len(SECTORS), dtype=np.float32)
+    stage_vec = np.zeros(len(STAGES), dtype=np.float32)
+
+    for sector in investor_data.preferred_sectors:
+        if sector in SECTORS:
+            sector_vec[SECTORS.index(sector)] = 1
+    for stage in investor_data.preferred_stages:
+        if stage in STAGES:
+            stage_vec[STAGES.index(stage)] = 1
+
+    # Combine features
+    investor_vec = np.concatenate([
+        investor_numeric,
+        investor_type_vec,
+        sector_vec,
+        stage_vec,
+        thesis_vec[0]
+    ], dtype=np.float32)
+
+    # Pad investor vector to expected size
+    return fit_width(investor_vec.reshape(1, -1), INVESTOR_FEATURES)[0]
+
+def vectorize_startups(startups, models, timer=NULL_TIMER):
+    """Build compat and traction feature matrices for a list of startups.
+
+    The descriptions go through the TF-IDF vectorizer in a single call, so
+    scoring N startups costs one transform instead of N.
+    """
+    n = len(startups)
+
+    # Numeric features
+    startup_numeric = np.array([
+        [
+            startup_data.employees,
+            startup_data.mrr,
+            startup_data.growth_rate,
+            startup_data.burn_rate,
+            startup_data.funding_to_date,
+            startup_data.last_valuation
+        ]
+        for startup_data in startups
+    ], dtype=np.float32).reshape(n, 6)
+
+    # Transform description text
+    with timer.stage('vectorize'):
+        desc_mat = models.description_vectorizer.transform([s.description for s in startups]).toarray()
+    if desc_mat.shape[1] != TEXT_FEATURES:
+        logger.warning(f"Unexpected description vector shape: {desc_mat.shape}")
+        desc_mat = np.pad(desc_mat, ((0, 0), (0, TEXT_FEATURES - desc_mat.shape[1])), 'constant')
+
+    # Sector and stage encoding
+    sector_mat = np.zeros((n, len(SECTORS)), dtype=np.float32)
+    stage_mat = np.zeros((n, len(STAGES)), dtype=np.float32)
+    for row, startup_data in enumerate(startups):
+        if startup_data.sector in SECTORS:
+            sector_mat[row, SECTORS.index(startup_data.sector)] = 1
+        if startup_data.stage in STAGES:
+            stage_mat[row, STAGES.index(startup_data.stage)] = 1
+
+    # Create base startup matrix
+    base_startup_mat = np.concatenate([
+        startup_numeric,
+        sector_mat,
+        stage_mat,
+        desc_mat
+    ], axis=1, dtype=np.float32)
+
+    # Create versions for different models
+    startup_mat_compat = fit_width(base_startup_mat, models.startup_compat_features)
+    startup_mat_traction = fit_width(base_startup_mat, models.startup_traction_features)
+    return startup_mat_compat, startup_mat_traction
+
+def vectorize_investor_frame(investors_df, models):
+    """vectorize_investor for every row of an investors DataFrame, shape (n, INVESTOR_FEATURES).
+
+    Rows go through InvestorInput like an API request does, so training
+    code gets exactly the vectors the service computes. `models` only needs
+    the attributes the vectorizers read.
+    """
+    vectors = [vectorize_investor(InvestorInput(**record), models) for record in investors_df.to_dict('records')]
+    return np.array(vectors, dtype=np.float32).reshape(-1, INVESTOR_FEATURES)
+
+def vectorize_startup_frame(startups_df, models):
+    """vectorize_startups for every row of a startups DataFrame, as (compat, traction) matrices"""
+    records = startups_df.astype({'founding_date': str}).to_dict('records')
+    return vectorize_startups([StartupInput(**record) for record in records], models)
+
+def build_term_map(thesis_vectorizer, description_vectorizer):
+    """Map thesis TF-IDF columns onto description TF-IDF columns for shared terms"""
+    description_vocab = description_vectorizer.vocabulary_
+    pairs = [
+        (thesis_col, description_vocab[term])
+        for thesis_col, term in enumerate(thesis_vectorizer.get_feature_names_out())
+        if thesis_col < TEXT_FEATURES and description_vocab.get(term, TEXT_FEATURES) < TEXT_FEATURES
+    ]
+    thesis_cols = np.array([pair[0] for pair in pairs], dtype=np.intp)
+    description_cols = np.array([pair[1] for pair in pairs], dtype=np.intp)
+    return thesis_cols, description_cols
+
+def investor_query_vector(investor_vec, models):
+    """Project an investor vector into the catalog search index space"""
+    query = np.zeros(INDEX_FEATURES, dtype=np.float32)
+    desc_offset = len(SECTORS) + len(STAGES)
+    query[:len(SECTORS)] = investor_vec[INVESTOR_SECTOR_SLICE]
+    query[len(SECTORS):desc_offset] = investor_vec[INVESTOR_STAGE_SLICE]
+    thesis = investor_vec[INVESTOR_THESIS_SLICE]
+    query[desc_offset + models.description_term_cols] = thesis[models.thesis_term_cols]
+    return query
+
+def startup_index_rows(startup_mat_compat):
+    """Search index rows (sector, stage, description terms) from compat vectors"""
+    return fit_width(startup_mat_compat[:, STARTUP_INDEX_SLICE], INDEX_FEATURES)
+
+def sector_similarity_matrix(industry_model):
+    """Similarity in [0, 1] between every pair of SECTORS, computed once per model.
+
+    Word2Vec-style models use (1 + cosine) / 2 over normalized sector
+    embeddings; sectors missing from the model score a neutral 0.5.
+    """
+    n = len(SECTORS)
+    if hasattr(industry_model, 'get_sector_similarity'):
+        return np.array([[industry_model.get_sector_similarity(a, b) for b in SECTORS] for a in SECTORS],
+                        dtype=np.float64)
+    if not (hasattr(industry_model, 'wv') and hasattr(industry_model.wv, 'similarity')):
+        return np.full((n, n), 0.5)
+
+    wv = industry_model.wv
+    present = np.array([sector in wv for sector in SECTORS])
+    matrix = np.full((n, n), 0.5)
+    if present.any():
+        vectors = np.array([wv[sector] for sector in np.array(SECTORS)[present]], dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            unit = vectors / norms
+        matrix[np.ix_(present, present)] = (1 + unit @ unit.T) / 2
+    return matrix
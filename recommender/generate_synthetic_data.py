@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Vectorized synthetic investors, startups and interactions for load tests.
+
+Produces the same columns and value ranges as generate_investors,
+generate_startups and generate_interactions in train_model.py, but every
+column of a chunk is drawn with one NumPy call. Text columns (names,
+theses, descriptions, locations) are sampled from pools pre-generated
+with Faker. The tables are written chunk by chunk to Parquet or Feather
+files, so memory stays bounded by the chunk size. Interactions only keep
+the investors' sector preferences and the startups' sectors in memory.
+Each chunk has its own generator seeded from (seed, table, chunk), so a
+given seed, chunk size and --end-date always produce the same files (the
+end date defaults to today).
+
+Usage: python generate_synthetic_data.py [--investors 100000] [--startups 1000000]
+           [--interactions 10000000] [--out-dir synthetic_data] [--format parquet]
+           [--chunk-rows 1000000] [--seed 42] [--end-date YYYY-MM-DD]
+"""
+
+import argparse
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from faker import Faker
+
+SECTORS = ['Tech', 'Healthcare', 'Fintech', 'Consumer', 'Enterprise', 'AI/ML', 'CleanTech']
+STAGES = ['Pre-seed', 'Seed', 'Series A', 'Series B', 'Growth']
+INVESTOR_TYPES = ['VC', 'Angel', 'Corporate', 'PE']
+POOL_SIZE = 5000
+TABLE_SEEDS = {'investors': 0, 'startups': 1, 'interactions': 2}
+
+
+def text_pools(seed, size=POOL_SIZE):
+    """Faker-generated values for the text columns, drawn from by index"""
+    fake = Faker()
+    Faker.seed(seed)
+    return {
+        'name': np.array([fake.company() for _ in range(size)], dtype=object),
+        'paragraph': np.array([fake.paragraph() for _ in range(size)], dtype=object),
+        'location': np.array([fake.country() for _ in range(size)], dtype=object)
+    }
+
+def chunk_rng(seed, table, chunk_index):
+    return np.random.default_rng([seed, TABLE_SEEDS[table], chunk_index])
+
+def ids_column(prefix, start, n):
+    return pa.array(np.char.add(prefix, np.arange(start, start + n).astype(str)).astype(object), type=pa.string())
+
+def pick(pool, rng, n):
+    return pa.array(pool[rng.integers(0, len(pool), n)], type=pa.string())
+
+def sample_choices(options, rng, n, max_k=3):
+    """1..max_k distinct options per row, as (list column, bitmask of the chosen option indices)"""
+    counts = rng.integers(1, max_k + 1, n)
+    # The first k entries of a random permutation per row, row-major
+    order = np.argsort(rng.random((n, len(options))), axis=1)[:, :max_k]
+    flat = order[np.arange(max_k) < counts[:, None]]
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    values = pa.array(np.array(options, dtype=object)[flat], type=pa.string())
+    masks = np.zeros(n, dtype=np.int64)
+    np.bitwise_or.at(masks, np.repeat(np.arange(n), counts), 1 << flat)
+    return pa.ListArray.from_arrays(pa.array(offsets), values), masks
+
+def random_dates(rng, n, end, days):
+    """Dates uniformly in the `days` days up to and including `end`"""
+    return pa.array(np.datetime64(end, 'D') - rng.integers(0, days + 1, n).astype('timedelta64[D]'), type=pa.date32())
+
+def investor_chunk(start, n, rng, pools):
+    """(record batch, preferred sector bitmask per investor)"""
+    sectors, sector_masks = sample_choices(SECTORS, rng, n)
+    stages, _ = sample_choices(STAGES, rng, n)
+    batch = pa.RecordBatch.from_pydict({
+        'id': ids_column('inv_', start, n),
+        'name': pick(pools['name'], rng, n),
+        'type': pa.array(np.array(INVESTOR_TYPES, dtype=object)[rng.integers(0, len(INVESTOR_TYPES), n)], type=pa.string()),
+        'avg_check_size': rng.integers(50, 501, n) * 1000,
+        'preferred_sectors': sectors,
+        'preferred_stages': stages,
+        'min_roi': rng.integers(2, 11, n),
+        'risk_appetite': rng.integers(1, 6, n),
+        'years_active': rng.integers(1, 21, n),
+        'thesis': pick(pools['paragraph'], rng, n),
+        'location': pick(pools['location'], rng, n),
+        'total_investments': rng.integers(5, 101, n)
+    })
+    return batch, sector_masks
+
+def startup_chunk(start, n, rng, pools, end):
+    """(record batch, sector index per startup)"""
+    sector_index = rng.integers(0, len(SECTORS), n)
+    has_revenue = rng.random(n) > 0.3
+    batch = pa.RecordBatch.from_pydict({
+        'id': ids_column('stp_', start, n),
+        'name': pick(pools['name'], rng, n),
+        'sector': pa.array(np.array(SECTORS, dtype=object)[sector_index], type=pa.string()),
+        'stage': pa.array(np.array(STAGES, dtype=object)[rng.integers(0, len(STAGES), n)], type=pa.string()),
+        'founding_date': random_dates(rng, n, end, 5 * 365),
+        'employees': rng.integers(1, 201, n),
+        'mrr': np.where(has_revenue, rng.integers(0, 501, n) * 1000, 0),
+        'growth_rate': rng.uniform(0, 2.0, n),
+        'burn_rate': rng.integers(10, 101, n) * 1000,
+        'funding_to_date': rng.integers(50, 5001, n) * 1000,
+        'description': pick(pools['paragraph'], rng, n),
+        'location': pick(pools['location'], rng, n),
+        'last_valuation': rng.integers(1, 51, n) * 1000000
+    })
+    return batch, sector_index.astype(np.int8)
+
+def interaction_chunk(n, rng, investor_sector_masks, startup_sectors, end):
+    investor_rows = rng.integers(0, len(investor_sector_masks), n)
+    startup_rows = rng.integers(0, len(startup_sectors), n)
+    # Sector matches are more likely to be positive, as in generate_interactions
+    sector_match = (investor_sector_masks[investor_rows] >> startup_sectors[startup_rows]) & 1
+    interacted = rng.random(n) < 0.3 + 0.4 * sector_match
+    invested = interacted & (rng.random(n) < 0.2)
+    return pa.RecordBatch.from_pydict({
+        'investor_id': pa.array(np.char.add('inv_', investor_rows.astype(str)).astype(object), type=pa.string()),
+        'startup_id': pa.array(np.char.add('stp_', startup_rows.astype(str)).astype(object), type=pa.string()),
+        'interacted': interacted.astype(np.int64),
+        'invested': invested.astype(np.int64),
+        'date': random_dates(rng, n, end, 2 * 365)
+    })
+
+
+class ChunkWriter:
+    """Appends record batches to one Parquet or Feather (Arrow IPC) file"""
+
+    def __init__(self, path, schema, file_format):
+        self.file_format = file_format
+        if file_format == 'parquet':
+            self._writer = pq.ParquetWriter(path, schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self.file_format != 'parquet':
+            self._sink.close()
+
+
+def write_table(path, file_format, total, chunk_rows, make_chunk):
+    """Write `total` rows produced by make_chunk(chunk_index, start, n) -> record batch"""
+    writer = None
+    try:
+        for chunk_index, start in enumerate(range(0, total, chunk_rows)):
+            batch = make_chunk(chunk_index, start, min(chunk_rows, total - start))
+            if writer is None:
+                writer = ChunkWriter(path, batch.schema, file_format)
+            writer.write(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def generate(out_dir, n_investors, n_startups, n_interactions, file_format='parquet',
+             chunk_rows=1_000_000, seed=42, end=None):
+    """Write investors, startups and interactions files to out_dir; returns their paths"""
+    end = end or date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    extension = 'parquet' if file_format == 'parquet' else 'feather'
+    paths = {table: os.path.join(out_dir, f"{table}.{extension}") for table in TABLE_SEEDS}
+    pools = text_pools(seed)
+
+    investor_sector_masks = np.empty(n_investors, dtype=np.int64)
+    def make_investors(chunk_index, start, n):
+        batch, masks = investor_chunk(start, n, chunk_rng(seed, 'investors', chunk_index), pools)
+        investor_sector_masks[start:start + n] = masks
+        return batch
+
+    startup_sectors = np.empty(n_startups, dtype=np.int8)
+    def make_startups(chunk_index, start, n):
+        batch, sectors = startup_chunk(start, n, chunk_rng(seed, 'startups', chunk_index), pools, end)
+        startup_sectors[start:start + n] = sectors
+        return batch
+
+    def make_interactions(chunk_index, start, n):
+        return interaction_chunk(n, chunk_rng(seed, 'interactions', chunk_index), investor_sector_masks, startup_sectors, end)
+
+    write_table(paths['investors'], file_format, n_investors, chunk_rows, make_investors)
+    write_table(paths['startups'], file_format, n_startups, chunk_rows, make_startups)
+    write_table(paths['interactions'], file_format, n_interactions, chunk_rows, make_interactions)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--investors', type=int, default=100_000)
+    parser.add_argument('--startups', type=int, default=1_000_000)
+    parser.add_argument('--interactions', type=int, default=10_000_000)
+    parser.add_argument('--out-dir', default='synthetic_data')
+    parser.add_argument('--format', choices=['parquet', 'feather'], default='parquet')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                        help="Latest founding/interaction date, YYYY-MM-DD (default today)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths = generate(args.out_dir, args.investors, args.startups, args.interactions,
+                     args.format, args.chunk_rows, args.seed, args.end_date)
+    elapsed = time.perf_counter() - started
+    for table, path in paths.items():
+        print(f"{table}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    print(f"Generated {args.investors} investors, {args.startups} startups and "
+          f"{args.interactions} interactions in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Rolling per-investor interaction windows for the investment history model.
+
+Every investor owns one slot in a (investors, seq_length, width) float32
+ring array. Appending an interaction overwrites the oldest row of that
+investor's ring and advances a pointer, so it is O(1) whatever the
+length of the history, and the window is never rebuilt from past
+interactions. Reading windows for a batch of investors is one fancy-index
+gather that also puts each ring back in oldest-first order.
+
+With a `log_path`, appended rows also go to a SharedLog (shared_log.py)
+and every buffer on that log replays the rows other processes appended
+before it reads or writes, so prefork workers see the same windows and
+the history survives restarts. The log is compacted to the last
+`seq_length` rows per investor when a buffer opens it.
+"""
+
+import threading
+
+import numpy as np
+
+from shared_log import SharedLog
+
+# Columns of an interaction row, as built by create_sequences in train_model.py
+INTERACTION_FEATURES = 5
+# Rewrite the log once it holds this many times more rows than the windows
+LOG_COMPACT_RATIO = 2
+
+
+def interaction_row(preferred_sectors, preferred_stages, startup, interacted):
+    """[sector match, stage match, MRR in millions, growth rate, interacted] for one interaction"""
+    mrr = startup.get('mrr')
+    return np.array([
+        1.0 if startup['sector'] in preferred_sectors else 0.0,
+        1.0 if startup['stage'] in preferred_stages else 0.0,
+        mrr / 1e6 if mrr is not None and not np.isnan(mrr) else 0.0,
+        startup['growth_rate'],
+        float(interacted)
+    ], dtype=np.float32)
+
+
+class HistoryBuffer:
+    """Last `seq_length` interaction rows per investor"""
+
+    def __init__(self, seq_length, width=INTERACTION_FEATURES, initial_capacity=1024, log_path=None):
+        self.seq_length = seq_length
+        self.width = width
+        self._initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._reset()
+        self._log = None
+        if log_path is not None:
+            self._log = SharedLog(log_path)
+            with self._lock, self._log.locked():
+                entries, _ = self._log.read_new()
+                self._replay(entries)
+                if len(entries) > LOG_COMPACT_RATIO * max(self._counts[:len(self._ids)].clip(max=seq_length).sum(), 1):
+                    self._compact_log()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _reset(self):
+        capacity = self._initial_capacity
+        self._rings = np.zeros((capacity, self.seq_length, self.width), dtype=np.float32)
+        self._next = np.zeros(capacity, dtype=np.intp)  # ring position the next row goes to
+        self._counts = np.zeros(capacity, dtype=np.int64)  # rows appended so far
+        self._ids = []
+        self._rows = {}
+
+    def _grow(self, capacity):
+        size = len(self._ids)
+        rings = np.zeros((capacity, self.seq_length, self.width), dtype=np.float32)
+        next_slots = np.zeros(capacity, dtype=np.intp)
+        counts = np.zeros(capacity, dtype=np.int64)
+        rings[:size] = self._rings[:size]
+        next_slots[:size] = self._next[:size]
+        counts[:size] = self._counts[:size]
+        self._rings, self._next, self._counts = rings, next_slots, counts
+
+    def _append(self, investor_id, feature_row):
+        row = self._rows.get(investor_id)
+        if row is None:
+            if len(self._ids) == self._rings.shape[0]:
+                self._grow(2 * self._rings.shape[0])
+            row = self._rows[investor_id] = len(self._ids)
+            self._ids.append(investor_id)
+        slot = self._next[row]
+        self._rings[row, slot] = feature_row
+        self._next[row] = (slot + 1) % self.seq_length
+        self._counts[row] += 1
+
+    def _replay(self, entries):
+        for entry in entries:
+            self._append(entry['id'], np.asarray(entry['row'], dtype=np.float32))
+
+    def _catch_up(self):
+        """Replay the rows other buffers logged; call with both locks held"""
+        entries, restarted = self._log.read_new()
+        if restarted:
+            self._reset()  # compacted elsewhere: the new file holds every window
+        self._replay(entries)
+
+    def _compact_log(self):
+        windows, counts = self._windows(self._ids)
+        self._log.rewrite([
+            {"id": investor_id, "row": row.tolist()}
+            for investor_id, window, count in zip(self._ids, windows, counts)
+            for row in window[self.seq_length - min(count, self.seq_length):]
+        ])
+
+    def append(self, investor_id, feature_row):
+        """Add one interaction row to an investor's window, dropping the oldest once it is full"""
+        self.extend([investor_id], [feature_row])
+
+    def extend(self, investor_ids, feature_rows):
+        """append() for several rows, in order, with one log write"""
+        with self._lock:
+            if self._log is None:
+                for investor_id, feature_row in zip(investor_ids, feature_rows):
+                    self._append(investor_id, feature_row)
+                return
+            with self._log.locked():
+                self._catch_up()
+                entries = [{"id": investor_id, "row": np.asarray(feature_row, dtype=np.float32).tolist()}
+                           for investor_id, feature_row in zip(investor_ids, feature_rows)]
+                self._log.append(entries)
+                self._replay(entries)
+
+    def windows(self, investor_ids):
+        """(windows oldest row first, number of rows appended) for each id; unknown ids get 0"""
+        with self._lock:
+            if self._log is not None and self._log.changed():
+                with self._log.locked():
+                    self._catch_up()
+            return self._windows(investor_ids)
+
+    def _windows(self, investor_ids):
+        rows = np.array([self._rows.get(investor_id, -1) for investor_id in investor_ids], dtype=np.intp)
+        known = rows >= 0
+        counts = np.where(known, self._counts[np.maximum(rows, 0)], 0)
+        order = (self._next[np.maximum(rows, 0)][:, None] + np.arange(self.seq_length)) % self.seq_length
+        windows = self._rings[np.maximum(rows, 0)[:, None], order]
+        windows[~known] = 0.0
+        return windows, counts
+
+    def stats(self):
+        return {
+            "investors": len(self._ids),
+            "capacity": self._rings.shape[0],
+            "seq_length": self.seq_length,
+            "width": self.width
+        }
@@ -1,37 +1,93 @@
-from fastapi import FastAPI, Response
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-import joblib
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import numpy as np
 from typing import List
 import os
+import json
 import logging
 import re
+import tempfile
+import time
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from batching import MicroBatcher
+import bulk_scoring
+from catalog import StartupCatalog
+from entity_store import EntityStore
+from explain import summarize, traction_shap_values
+from feature_cache import FeatureCache, canonical_key
+from history_buffer import INTERACTION_FEATURES, HistoryBuffer, interaction_row
+import metrics
+from features import (
+    INDEX_FEATURES,
+    INVESTOR_FEATURES,
+    SECTOR_INDEX,
+    SECTORS,
+    investor_query_vector,
+    startup_index_rows,
+    vectorize_investor,
+    vectorize_startups
+)
+from model_registry import ModelRegistry
+from models import top_n_indices
+import raw_protocol
+from request_logging import NULL_TIMER, StageTimer, log_request, setup_logging, should_sample, start_listener
+from schemas import (
+    CatalogStartupInput,
+    CompatibilityByIdRequest,
+    InteractionInput,
+    InvestorInput,
+    NextInteractionRequest,
+    RegisteredInvestorInput,
+    SectorPair,
+    StartupInput,
+    TractionByIdRequest,
+    sample_investor,
+    sample_startup
+)
+from single_flight import SingleFlight
+from sparse_features import sparse_compat_matrix, sparse_investor_rows, sparse_invalid_rows, sparse_startup_rows
+
+# Set up logging: handlers only enqueue records, a background listener
+# writes app.log and the console
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-# Set up additional logging handlers
-file_handler = logging.FileHandler('app.log')
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins in development
     allow_credentials=False,  # Set to False when allow_origins=["*"]
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Model-Version"]
 )
 
+class ModelVersionHeaderMiddleware:
+    """Adds X-Model-Version, the ModelSet that served the request, to every response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        async def send_with_version(message):
+            if message['type'] == 'http.response.start':
+                version = scope.get('state', {}).get('model_version')
+                if version is not None:
+                    message['headers'] = list(message.get('headers', [])) + [(b'x-model-version', version.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
+
+app.add_middleware(ModelVersionHeaderMiddleware)
+
 # Mount static files directory
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -45,379 +101,1354 @@ async def read_root():
 async def favicon():
     return Response(status_code=204)  # No content, suppresses 404
 
-# Define input models
-class InvestorInput(BaseModel):
-    type: str
-    location: str
-    avg_check_size: float
-    min_roi: float
-    risk_appetite: float
-    years_active: float
-    total_investments: float
-    preferred_sectors: List[str]
-    preferred_stages: List[str]
-    thesis: str
-
-class StartupInput(BaseModel):
-    sector: str
-    stage: str
-    location: str
-    founding_date: str
-    employees: int
-    mrr: float
-    growth_rate: float
-    burn_rate: float
-    funding_to_date: float
-    description: str
-    last_valuation: float
-
-# Load pre-trained models and vectorizers
-try:
-    compat_model = joblib.load('compatibility_model.joblib')
-    traction_model = joblib.load('traction_model.joblib')
-    industry_model = joblib.load('industry_model.joblib')
-    thesis_vectorizer = joblib.load('thesis_vectorizer.joblib')
-    description_vectorizer = joblib.load('description_vectorizer.joblib')
-    logger.info("Models and vectorizers loaded successfully.")
-    
-    # Get actual expected feature dimensions from the models
-    COMPAT_EXPECTED_FEATURES = compat_model.n_features_in_
-    TRACTION_EXPECTED_FEATURES = traction_model.n_features_in_
-    logger.info(f"Model expected features - Compatibility: {COMPAT_EXPECTED_FEATURES}, Traction: {TRACTION_EXPECTED_FEATURES}")
-    
-except Exception as e:
-    logger.error(f"Failed to load models or vectorizers: {str(e)}")
-    raise
-
-# Define global constants
-SECTORS = ['Tech', 'Healthcare', 'Fintech', 'Consumer', 'Enterprise', 'AI/ML', 'CleanTech']
-STAGES = ['Pre-seed', 'Seed', 'Series A', 'Series B', 'Growth']
-INVESTOR_TYPES = {"VC": 0, "Angel": 1, "Corporate": 2, "PE": 3}
-
-# Calculate investor and startup feature dimensions based on model expectations
-# Assuming compatibility model expects investor + startup features
-INVESTOR_FEATURES = 250  # Based on your original setup
-STARTUP_COMPAT_FEATURES = COMPAT_EXPECTED_FEATURES - INVESTOR_FEATURES
-STARTUP_TRACTION_FEATURES = TRACTION_EXPECTED_FEATURES
-
-logger.info(f"Adjusted feature dimensions - Investor: {INVESTOR_FEATURES}, Startup Compat: {STARTUP_COMPAT_FEATURES}, Startup Traction: {STARTUP_TRACTION_FEATURES}")
+# Model registry: artifacts load in a background thread after startup, with
+# a warm-up inference before the models are published. New artifacts can be
+# hot-swapped through /admin/reload_models/ or the optional file watcher
+MODEL_DIR = os.environ.get('RECOMMENDER_MODEL_DIR', '.')
+MODEL_WATCH_SECONDS = float(os.environ.get('RECOMMENDER_MODEL_WATCH_SECONDS', 0))
+ADMIN_TOKEN = os.environ.get('RECOMMENDER_ADMIN_TOKEN')
+
+def warm_up(models):
+    """Run one inference through every model so the first real request is not slow"""
+    started = time.perf_counter()
+    investor_vec = vectorize_investor(sample_investor(), models)
+    startup_mat_compat, startup_mat_traction = vectorize_startups([sample_startup()], models)
+    combined_vec = np.concatenate([investor_vec, startup_mat_compat[0]]).reshape(1, -1)
+    models.compat_proba(combined_vec)
+    models.traction_model.predict(startup_mat_traction)
+    warm_up_history(models)
+    logger.info(f"Warm-up inference finished in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+def warm_up_history(models):
+    if models.history_model is not None:
+        models.history_model.predict(np.zeros((1, models.history_seq_length, INTERACTION_FEATURES), dtype=np.float32), verbose=0)
+
+def on_models_loaded(models):
+    logger.info(f"Model expected features - Compatibility: {models.compat_features}, Traction: {models.traction_features}")
+    logger.info(f"Adjusted feature dimensions - Investor: {INVESTOR_FEATURES}, Startup Compat: {models.startup_compat_features}, Startup Traction: {models.startup_traction_features}")
+    warm_up(models)
+    # Build the per-version explanation tables now rather than on the first request
+    models.compat_explainer, models.compat_layout, models.traction_layout
+    open_entity_stores(models)
+    open_history_buffer(models)
+    models.catalog = build_catalog(models)
+
+registry = ModelRegistry(MODEL_DIR, on_load=on_models_loaded)
+
+# TensorFlow's runtime does not survive fork(): a worker forked after the
+# parent ran the history model hangs in its first prediction. The prefork
+# launcher therefore defers that model and each worker loads its own
+FORK_UNSAFE_ARTIFACTS = ('history_model',)
+
+def load_deferred_models():
+    """Load the artifacts the prefork parent deferred, in the worker process"""
+    registry.deferred = ()  # this worker's own reloads load everything
+    models = registry.get()
+    if models is None or not models.deferred_paths:
+        return
+    names = models.load_deferred()
+    warm_up_history(models)
+    open_history_buffer(models)
+    logger.info(f"Loaded {', '.join(names)} in worker {os.getpid()}")
+
+def get_models(request: Request):
+    """Dependency that hands the current ModelSet to a handler, or 503 while loading.
+
+    The handler keeps this reference for the whole request, so a reload
+    never changes models halfway through one.
+    """
+    models = registry.get()
+    if models is None:
+        raise HTTPException(status_code=503, detail=f"Models are not ready (state: {registry.state})")
+    request.state.model_version = models.version
+    return models
+
+@app.on_event("startup")
+async def start_model_loading():
+    start_listener()
+    registry.start_background_load()
+    registry.start_watcher(MODEL_WATCH_SECONDS)
+
+@app.post("/admin/reload_models/")
+async def reload_models(request: Request):
+    """Load the artifacts in RECOMMENDER_MODEL_DIR again and swap them in once validated and warmed up"""
+    if ADMIN_TOKEN and request.headers.get('x-admin-token') != ADMIN_TOKEN:
+        return JSONResponse(status_code=403, content={"error": "Invalid admin token"})
+    started = registry.start_background_reload()
+    return JSONResponse(status_code=202 if started else 409, content={"started": started, **registry.status()})
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and serving"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: 200 only once the models are loaded and warmed up"""
+    status = registry.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+# Feature caches in front of the vectorizers (sized through the environment)
+FEATURE_CACHE_SIZE = int(os.environ.get('RECOMMENDER_FEATURE_CACHE_SIZE', 10000))
+FEATURE_CACHE_TTL = float(os.environ.get('RECOMMENDER_FEATURE_CACHE_TTL', 3600))
+investor_cache = FeatureCache(max_size=FEATURE_CACHE_SIZE, ttl_seconds=FEATURE_CACHE_TTL)
+startup_cache = FeatureCache(max_size=FEATURE_CACHE_SIZE, ttl_seconds=FEATURE_CACHE_TTL)
+
+def get_investor_vector(investor_data, models, timer=NULL_TIMER):
+    """Cached wrapper around vectorize_investor; the returned array is read-only"""
+    key = canonical_key(investor_data, f'investor:{models.feature_version}')
+    investor_vec = investor_cache.get(key)
+    if investor_vec is None:
+        investor_vec = vectorize_investor(investor_data, models, timer)
+        investor_vec.flags.writeable = False
+        investor_cache.put(key, investor_vec)
+    return investor_vec
+
+def get_startup_vectors(startups, models, timer=NULL_TIMER):
+    """Cached wrapper around vectorize_startups; only cache misses are vectorized"""
+    keys = [canonical_key(startup_data, f'startup:{models.feature_version}') for startup_data in startups]
+    startup_mat_compat = np.empty((len(startups), models.startup_compat_features), dtype=np.float32)
+    startup_mat_traction = np.empty((len(startups), models.startup_traction_features), dtype=np.float32)
+
+    missing = []
+    for row, key in enumerate(keys):
+        cached = startup_cache.get(key)
+        if cached is None:
+            missing.append(row)
+        else:
+            startup_mat_compat[row], startup_mat_traction[row] = cached
+
+    if missing:
+        compat_rows, traction_rows = vectorize_startups([startups[row] for row in missing], models, timer)
+        startup_mat_compat[missing] = compat_rows
+        startup_mat_traction[missing] = traction_rows
+        for i, row in enumerate(missing):
+            compat_vec, traction_vec = compat_rows[i].copy(), traction_rows[i].copy()
+            compat_vec.flags.writeable = False
+            traction_vec.flags.writeable = False
+            startup_cache.put(keys[row], (compat_vec, traction_vec))
+
+    return startup_mat_compat, startup_mat_traction
 
 # Preprocessing function (aligned with model expectations)
-def preprocess_input(investor_data, startup_data):
+def preprocess_input(investor_data, startup_data, models):
     try:
         if investor_data:
-            # Numeric features
-            investor_numeric = np.array([
-                investor_data.avg_check_size,
-                investor_data.min_roi,
-                investor_data.risk_appetite,
-                investor_data.years_active,
-                investor_data.total_investments
-            ], dtype=np.float32)
-
-            # Transform thesis text
-            thesis_vec = thesis_vectorizer.transform([investor_data.thesis]).toarray()
-            if thesis_vec.shape[1] != 50:  # Adjust based on your TF-IDF vectorizer's max_features
-                logger.warning(f"Unexpected thesis vector shape: {thesis_vec.shape}")
-                thesis_vec = np.pad(thesis_vec, ((0, 0), (0, 50 - thesis_vec.shape[1])), 'constant')
-
-            # One-hot encoding for type
-            investor_type_vec = np.zeros(4, dtype=np.float32)
-            if investor_data.type.upper() in INVESTOR_TYPES:
-                investor_type_vec[INVESTOR_TYPES[investor_data.type.upper()]] = 1
-
-            # Sector and stage preferences (fixed size vectors)
-            sector_vec = np.zeros(len(SECTORS), dtype=np.float32)
-            stage_vec = np.zeros(len(STAGES), dtype=np.float32)
-
-            for sector in investor_data.preferred_sectors:
-                if sector in SECTORS:
-                    sector_vec[SECTORS.index(sector)] = 1
-            for stage in investor_data.preferred_stages:
-                if stage in STAGES:
-                    stage_vec[STAGES.index(stage)] = 1
-
-            # Combine features
-            investor_vec = np.concatenate([
-                investor_numeric,
-                investor_type_vec,
-                sector_vec,
-                stage_vec,
-                thesis_vec[0]
-            ], dtype=np.float32)
-            
-            # Pad investor vector to expected size
-            if investor_vec.shape[0] < INVESTOR_FEATURES:
-                investor_vec = np.pad(investor_vec, (0, INVESTOR_FEATURES - investor_vec.shape[0]), 'constant')
-            elif investor_vec.shape[0] > INVESTOR_FEATURES:
-                investor_vec = investor_vec[:INVESTOR_FEATURES]
+            investor_vec = get_investor_vector(investor_data, models)
         else:
             investor_vec = np.zeros(INVESTOR_FEATURES, dtype=np.float32)
 
         if startup_data:
-            # Numeric features
-            startup_numeric = np.array([
-                startup_data.employees,
-                startup_data.mrr,
-                startup_data.growth_rate,
-                startup_data.burn_rate,
-                startup_data.funding_to_date,
-                startup_data.last_valuation
-            ], dtype=np.float32)
-
-            # Transform description text
-            desc_vec = description_vectorizer.transform([startup_data.description]).toarray()
-            if desc_vec.shape[1] != 50:
-                logger.warning(f"Unexpected description vector shape: {desc_vec.shape}")
-                desc_vec = np.pad(desc_vec, ((0, 0), (0, 50 - desc_vec.shape[1])), 'constant')
-
-            # Sector and stage encoding
-            sector_vec = np.zeros(len(SECTORS), dtype=np.float32)
-            stage_vec = np.zeros(len(STAGES), dtype=np.float32)
-            if startup_data.sector in SECTORS:
-                sector_vec[SECTORS.index(startup_data.sector)] = 1
-            if startup_data.stage in STAGES:
-                stage_vec[STAGES.index(startup_data.stage)] = 1
-
-            # Create base startup vector
-            base_startup_vec = np.concatenate([
-                startup_numeric,
-                sector_vec,
-                stage_vec,
-                desc_vec[0]
-            ], dtype=np.float32)
-
-            # Create versions for different models
-            startup_vec_compat = base_startup_vec.copy()
-            if startup_vec_compat.shape[0] < STARTUP_COMPAT_FEATURES:
-                startup_vec_compat = np.pad(startup_vec_compat, (0, STARTUP_COMPAT_FEATURES - startup_vec_compat.shape[0]), 'constant')
-            elif startup_vec_compat.shape[0] > STARTUP_COMPAT_FEATURES:
-                startup_vec_compat = startup_vec_compat[:STARTUP_COMPAT_FEATURES]
-            
-            startup_vec_traction = base_startup_vec.copy()
-            if startup_vec_traction.shape[0] < STARTUP_TRACTION_FEATURES:
-                startup_vec_traction = np.pad(startup_vec_traction, (0, STARTUP_TRACTION_FEATURES - startup_vec_traction.shape[0]), 'constant')
-            elif startup_vec_traction.shape[0] > STARTUP_TRACTION_FEATURES:
-                startup_vec_traction = startup_vec_traction[:STARTUP_TRACTION_FEATURES]
-            
-            startup_vectors = (startup_vec_compat, startup_vec_traction)
+            startup_mat_compat, startup_mat_traction = get_startup_vectors([startup_data], models)
+            startup_vectors = (startup_mat_compat[0], startup_mat_traction[0])
         else:
-            startup_vectors = (np.zeros(STARTUP_COMPAT_FEATURES, dtype=np.float32), 
-                              np.zeros(STARTUP_TRACTION_FEATURES, dtype=np.float32))
+            startup_vectors = (np.zeros(models.startup_compat_features, dtype=np.float32), 
+                              np.zeros(models.startup_traction_features, dtype=np.float32))
 
-        logger.info(f"Investor vector shape: {investor_vec.shape}, Startup vectors shapes: compat={startup_vectors[0].shape}, traction={startup_vectors[1].shape}")
+        logger.debug("Investor vector shape: %s, Startup vectors shapes: compat=%s, traction=%s",
+                     investor_vec.shape, startup_vectors[0].shape, startup_vectors[1].shape)
         return investor_vec, startup_vectors
     except Exception as e:
         logger.error(f"Preprocessing error: {str(e)}")
         raise
 
+class ScoringError(ValueError):
+    """A single request in a scheduled batch could not be scored"""
+
+def group_by_model_set(items):
+    """Split scheduler items (models, ...) into per-ModelSet groups of item indices"""
+    groups = {}
+    for index, item in enumerate(items):
+        groups.setdefault(id(item[0]), (item[0], []))[1].append(index)
+    return groups.values()
+
+def score_compatibility_pairs(items):
+    """Scheduler batch function: score (models, investor, startup) items in one predict per ModelSet.
+
+    Successful items resolve to (score, stage timings of their batch, batch size).
+    """
+    results = [None] * len(items)
+    for models, indices in group_by_model_set(items):
+        timer = StageTimer()
+        with timer.stage('preprocess'):
+            investor_mat = np.stack([get_investor_vector(items[i][1], models, timer) for i in indices])
+            startup_mat_compat, _ = get_startup_vectors([items[i][2] for i in indices], models, timer)
+            combined_mat = np.concatenate([investor_mat, startup_mat_compat], axis=1)
+
+        # Validate expected dimensions
+        if combined_mat.shape[1] != models.compat_features:
+            error = f"Feature dimension mismatch. Expected {models.compat_features}, got {combined_mat.shape[1]}"
+            metrics.observe_rejections('predict_compatibility', 'dimension_mismatch', len(indices))
+            for i in indices:
+                results[i] = ScoringError(error)
+            continue
+
+        # Rows with NaN values are not sent to the model
+        invalid_rows = np.isnan(combined_mat).any(axis=1)
+        scores = np.full(len(indices), np.nan)
+        if not invalid_rows.all():
+            with timer.stage('predict'):
+                scores[~invalid_rows] = models.compat_proba(combined_mat[~invalid_rows])
+        metrics.observe_rejections('predict_compatibility', 'nan_input', int(invalid_rows.sum()))
+        metrics.observe_rejections('predict_compatibility', 'invalid_score', int((np.isnan(scores) & ~invalid_rows).sum()))
+        for row, i in enumerate(indices):
+            if invalid_rows[row]:
+                results[i] = ScoringError("Invalid input values detected")
+            elif np.isnan(scores[row]):
+                results[i] = ScoringError("Model produced invalid score")
+            else:
+                results[i] = (float(scores[row]), timer.stages, len(indices))
+    return results
+
+def score_traction_startups(items):
+    """Scheduler batch function: score (models, startup) items in one predict per ModelSet.
+
+    Successful items resolve to (score, stage timings of their batch, batch size).
+    """
+    results = [None] * len(items)
+    for models, indices in group_by_model_set(items):
+        timer = StageTimer()
+        with timer.stage('preprocess'):
+            _, startup_mat_traction = get_startup_vectors([items[i][1] for i in indices], models, timer)
+
+        # Validate expected dimensions
+        if startup_mat_traction.shape[1] != models.traction_features:
+            error = f"Feature dimension mismatch. Expected {models.traction_features}, got {startup_mat_traction.shape[1]}"
+            metrics.observe_rejections('predict_traction', 'dimension_mismatch', len(indices))
+            for i in indices:
+                results[i] = ScoringError(error)
+            continue
+
+        invalid_rows = np.isnan(startup_mat_traction).any(axis=1)
+        scores = np.full(len(indices), np.nan)
+        if not invalid_rows.all():
+            with timer.stage('predict'):
+                scores[~invalid_rows] = models.traction_model.predict(startup_mat_traction[~invalid_rows])
+        metrics.observe_rejections('predict_traction', 'nan_input', int(invalid_rows.sum()))
+        metrics.observe_rejections('predict_traction', 'invalid_score', int((np.isnan(scores) & ~invalid_rows).sum()))
+        for row, i in enumerate(indices):
+            if invalid_rows[row]:
+                results[i] = ScoringError("Invalid input values detected")
+            elif np.isnan(scores[row]):
+                results[i] = ScoringError("Model produced invalid score")
+            else:
+                results[i] = (float(scores[row]), timer.stages, len(indices))
+    return results
+
+def predict_history_windows(items):
+    """Scheduler batch function: (models, windows) items, one history model call per ModelSet.
+
+    Each item resolves to (probabilities for its windows, rows in the model call).
+    """
+    results = [None] * len(items)
+    for models, indices in group_by_model_set(items):
+        windows = np.concatenate([items[i][1] for i in indices])
+        probabilities = models.history_model.predict(windows, verbose=0).reshape(-1)
+        offset = 0
+        for i in indices:
+            results[i] = (probabilities[offset:offset + len(items[i][1])], len(windows))
+            offset += len(items[i][1])
+    return results
+
+# Micro-batching schedulers: concurrent requests are collected for up to
+# BATCH_MAX_WAIT_MS (or BATCH_MAX_SIZE requests) and scored together on a
+# worker thread, keeping model code off the event loop
+BATCH_MAX_SIZE = int(os.environ.get('RECOMMENDER_BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('RECOMMENDER_BATCH_MAX_WAIT_MS', 2))
+BATCH_WORKERS = int(os.environ.get('RECOMMENDER_BATCH_WORKERS', 1))
+compat_scheduler = MicroBatcher(score_compatibility_pairs, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_WORKERS, name='compat-batcher')
+traction_scheduler = MicroBatcher(score_traction_startups, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_WORKERS, name='traction-batcher')
+history_scheduler = MicroBatcher(predict_history_windows, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_WORKERS, name='history-batcher')
+
+# Identical concurrent scoring calls (e.g. several frontend components
+# asking about the same startup) share one scheduled computation
+compat_flight = SingleFlight('predict_compatibility')
+traction_flight = SingleFlight('predict_traction')
+
+@app.on_event("startup")
+async def start_schedulers():
+    compat_scheduler.start()
+    traction_scheduler.start()
+    history_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_schedulers():
+    compat_scheduler.stop()
+    traction_scheduler.stop()
+    history_scheduler.stop()
+
 @app.post("/predict_compatibility/")
-async def predict_compatibility(investor: InvestorInput, startup: StartupInput):
+async def predict_compatibility(investor: InvestorInput, startup: StartupInput, models=Depends(get_models)):
+    started = time.perf_counter()
     try:
-        # Detailed logging of input data
-        logger.info("Received investor data:")
-        logger.info(f"Type: {investor.type}")
-        logger.info(f"Check size: {investor.avg_check_size}")
-        logger.info(f"ROI: {investor.min_roi}")
-        logger.info(f"Risk: {investor.risk_appetite}")
-        logger.info(f"Sectors: {investor.preferred_sectors}")
-        logger.info(f"Stages: {investor.preferred_stages}")
-        
-        logger.info("Received startup data:")
-        logger.info(f"Sector: {startup.sector}")
-        logger.info(f"Stage: {startup.stage}")
-        logger.info(f"MRR: {startup.mrr}")
-        logger.info(f"Growth: {startup.growth_rate}")
-        
-        # Get feature vectors
-        investor_vec, (startup_vec_compat, _) = preprocess_input(investor, startup)
-        logger.info(f"Generated vectors - Investor: {investor_vec.shape}, Startup: {startup_vec_compat.shape}")
-        
-        # Combine vectors for compatibility prediction
-        combined_vec = np.concatenate([investor_vec, startup_vec_compat])
-        logger.info(f"Combined vector shape: {combined_vec.shape}")
-        
-        # Validate expected dimensions
-        if combined_vec.shape[0] != COMPAT_EXPECTED_FEATURES:
-            logger.error(f"Feature dimension mismatch. Expected {COMPAT_EXPECTED_FEATURES}, got {combined_vec.shape[0]}")
-            return {"error": f"Feature dimension mismatch. Expected {COMPAT_EXPECTED_FEATURES}, got {combined_vec.shape[0]}", "compatibility_score": 0.0}
-        
-        # Check for NaN values
-        if np.isnan(combined_vec).any():
-            logger.error("NaN values detected in feature vector")
-            return {"error": "Invalid input values detected", "compatibility_score": 0.0}
-            
-        # Reshape and predict
-        reshaped_vec = combined_vec.reshape(1, -1)
-        logger.info(f"Making prediction with vector shape: {reshaped_vec.shape}")
-        
-        # Get model prediction
-        compatibility_score = float(compat_model.predict_proba(reshaped_vec)[0][1])
-        logger.info(f"Prediction complete. Score: {compatibility_score}")
-        
-        if np.isnan(compatibility_score):
-            logger.error("Model produced NaN score")
-            return {"error": "Model produced invalid score", "compatibility_score": 0.0}
+        # Preprocessing and prediction run batched on a scheduler worker
+        try:
+            key = f"{models.version}:{canonical_key(investor)}:{canonical_key(startup)}"
+            compatibility_score, stages, batch_size = await compat_flight.run(
+                key, lambda: compat_scheduler.submit((models, investor, startup)))
+        except ScoringError as e:
+            log_request('predict_compatibility', started, status='rejected', error=str(e), level=logging.WARNING)
+            return {"error": str(e), "compatibility_score": 0.0}
+
+        # Full inputs are only logged for a sample of requests
+        debug = {"investor": investor.model_dump(), "startup": startup.model_dump()} if should_sample() else None
+        log_request('predict_compatibility', started, stages, status='ok', batch_size=batch_size,
+                    score=compatibility_score, debug=debug)
             
         return {
             "compatibility_score": compatibility_score,
-            "investor_features": investor_vec.shape[0],
-            "startup_features": startup_vec_compat.shape[0],
-            "total_features": combined_vec.shape[0]
+            "investor_features": INVESTOR_FEATURES,
+            "startup_features": models.startup_compat_features,
+            "total_features": models.compat_features,
+            "model_version": models.version
         }
     except Exception as e:
         logger.error(f"Error in predict_compatibility: {str(e)}")
+        metrics.observe_error('predict_compatibility')
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return {"error": str(e), "compatibility_score": 0.0}
 
-@app.post("/predict_traction/")
-async def predict_traction(startup: StartupInput):
+# Large batches are built as CSR matrices and scored by the model's own
+# predict_proba, skipping the dense feature cache. Measured with
+# benchmark_sparse_features.py, the sparse path is slower below about 1024
+# startups and on par or faster from there, with a ~14x smaller matrix
+SPARSE_MIN_BATCH = int(os.environ.get('RECOMMENDER_SPARSE_MIN_BATCH', 1024))
+
+@app.post("/predict_compatibility_batch/")
+def predict_compatibility_batch(investor: InvestorInput, startups: List[StartupInput], models=Depends(get_models)):
+    """Score one investor against many startups in a single model call.
+
+    Scores are returned in the same order as `startups`.
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
     try:
-        logger.info(f"Processing traction prediction for startup: {startup.sector}")
-        
-        # Get feature vector
-        _, (_, startup_vec_traction) = preprocess_input(None, startup)
-        logger.info(f"Generated startup vector shape: {startup_vec_traction.shape}")
-        
-        # Validate expected dimensions
-        if startup_vec_traction.shape[0] != TRACTION_EXPECTED_FEATURES:
-            logger.error(f"Feature dimension mismatch. Expected {TRACTION_EXPECTED_FEATURES}, got {startup_vec_traction.shape[0]}")
-            return {"error": f"Feature dimension mismatch. Expected {TRACTION_EXPECTED_FEATURES}, got {startup_vec_traction.shape[0]}", "traction_score": 0.0}
-        
-        # Check for NaN values
-        if np.isnan(startup_vec_traction).any():
-            logger.error("NaN values detected in feature vector")
+        if not startups:
+            return {"compatibility_scores": [], "count": 0}
+
+        # Investor features are computed once and broadcast over every startup row
+        sparse = len(startups) >= SPARSE_MIN_BATCH
+        with timer.stage('preprocess'):
+            if sparse:
+                # Large batches skip the feature cache and stay sparse end to end
+                with timer.stage('vectorize'):
+                    combined_mat = sparse_compat_matrix(sparse_investor_rows([investor], models),
+                                                        sparse_startup_rows(startups, models)[0])
+                invalid_rows = sparse_invalid_rows(combined_mat)
+            else:
+                investor_vec = get_investor_vector(investor, models, timer)
+                startup_mat_compat, _ = get_startup_vectors(startups, models, timer)
+
+                combined_mat = np.empty((len(startups), models.compat_features), dtype=np.float32)
+                combined_mat[:, :INVESTOR_FEATURES] = investor_vec
+                combined_mat[:, INVESTOR_FEATURES:] = startup_mat_compat
+                invalid_rows = np.isnan(combined_mat).any(axis=1)
+
+        # Rows with NaN features are not scored
+        scores = np.zeros(len(startups), dtype=np.float64)
+        if not invalid_rows.all():
+            with timer.stage('predict'):
+                scores[~invalid_rows] = models.compat_proba(combined_mat[np.flatnonzero(~invalid_rows)])
+        metrics.observe_rejections('predict_compatibility_batch', 'nan_input', int(invalid_rows.sum()))
+        metrics.observe_rejections('predict_compatibility_batch', 'invalid_score', int((np.isnan(scores) & ~invalid_rows).sum()))
+        invalid_rows |= np.isnan(scores)
+        scores[invalid_rows] = 0.0
+        log_request('predict_compatibility_batch', started, timer.stages, status='ok',
+                    batch_size=len(startups), invalid=int(invalid_rows.sum()), sparse=sparse)
+
+        return {
+            "compatibility_scores": scores.tolist(),
+            "invalid_indices": np.flatnonzero(invalid_rows).tolist(),
+            "count": len(startups),
+            "investor_features": INVESTOR_FEATURES,
+            "startup_features": models.startup_compat_features,
+            "total_features": models.compat_features,
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in predict_compatibility_batch: {str(e)}")
+        metrics.observe_error('predict_compatibility_batch')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "compatibility_scores": [0.0] * len(startups)}
+
+def analyze_startups(investor, startups, models, timer=NULL_TIMER):
+    """Compatibility, traction and sector similarity for one investor and many startups.
+
+    Every startup is vectorized once for both models. Returns compat and
+    traction scores (NaN for rows with NaN features), the investor's known
+    preferred sectors and a (startups x preferred sectors) similarity matrix
+    (NaN where the startup's sector is unknown).
+    """
+    with timer.stage('preprocess'):
+        investor_vec = get_investor_vector(investor, models, timer)
+        startup_mat_compat, startup_mat_traction = get_startup_vectors(startups, models, timer)
+        combined_mat = np.empty((len(startups), models.compat_features), dtype=np.float32)
+        combined_mat[:, :INVESTOR_FEATURES] = investor_vec
+        combined_mat[:, INVESTOR_FEATURES:] = startup_mat_compat
+
+    compat_scores = np.full(len(startups), np.nan)
+    traction_scores = np.full(len(startups), np.nan)
+    valid_compat = ~np.isnan(combined_mat).any(axis=1)
+    valid_traction = ~np.isnan(startup_mat_traction).any(axis=1)
+    with timer.stage('predict'):
+        if valid_compat.any():
+            compat_scores[valid_compat] = models.compat_proba(combined_mat[valid_compat])
+        if valid_traction.any():
+            traction_scores[valid_traction] = models.traction_model.predict(startup_mat_traction[valid_traction])
+
+    # Sector similarity comes from the matrix precomputed at model load
+    preferred = [sector for sector in dict.fromkeys(investor.preferred_sectors) if sector in SECTOR_INDEX]
+    startup_sectors = np.array([SECTOR_INDEX.get(startup_data.sector, -1) for startup_data in startups], dtype=np.intp)
+    known = startup_sectors >= 0
+    similarities = np.full((len(startups), len(preferred)), np.nan)
+    similarities[known] = models.sector_matrix[np.ix_(startup_sectors[known], [SECTOR_INDEX[s] for s in preferred])]
+    return compat_scores, traction_scores, preferred, similarities
+
+def analysis_result(compat_score, traction_score, preferred, similarities):
+    """JSON fields for one analyzed startup; invalid scores become 0.0"""
+    sector_similarity = {sector: float(similarity) for sector, similarity in zip(preferred, similarities)
+                         if not np.isnan(similarity)}
+    return {
+        "compatibility_score": 0.0 if np.isnan(compat_score) else float(compat_score),
+        "traction_score": 0.0 if np.isnan(traction_score) else float(traction_score),
+        "sector_similarity": sector_similarity,
+        "best_sector_similarity": max(sector_similarity.values(), default=0.0)
+    }
+
+@app.post("/analyze/")
+def analyze(investor: InvestorInput, startup: StartupInput, models=Depends(get_models)):
+    """Compatibility, traction and sector similarity for one pair, from one preprocessing pass"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        compat_scores, traction_scores, preferred, similarities = analyze_startups(investor, [startup], models, timer)
+        result = analysis_result(compat_scores[0], traction_scores[0], preferred, similarities[0])
+        if np.isnan(compat_scores[0]) or np.isnan(traction_scores[0]):
+            metrics.observe_rejections('analyze', 'nan_input')
+            log_request('analyze', started, timer.stages, status='rejected',
+                        error="Invalid input values detected", level=logging.WARNING)
+            return {"error": "Invalid input values detected", **result}
+
+        log_request('analyze', started, timer.stages, status='ok')
+        return {**result, "model_version": models.version}
+    except Exception as e:
+        logger.error(f"Error in analyze: {str(e)}")
+        metrics.observe_error('analyze')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "compatibility_score": 0.0, "traction_score": 0.0, "sector_similarity": {}}
+
+@app.post("/analyze_batch/")
+def analyze_batch(investor: InvestorInput, startups: List[StartupInput], models=Depends(get_models)):
+    """Full analysis of one investor against many startups; results are in the order of `startups`"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        if not startups:
+            return {"results": [], "invalid_indices": [], "count": 0}
+
+        compat_scores, traction_scores, preferred, similarities = analyze_startups(investor, startups, models, timer)
+        invalid_rows = np.isnan(compat_scores) | np.isnan(traction_scores)
+        metrics.observe_rejections('analyze_batch', 'nan_input', int(invalid_rows.sum()))
+        log_request('analyze_batch', started, timer.stages, status='ok', batch_size=len(startups),
+                    invalid=int(invalid_rows.sum()))
+
+        return {
+            "results": [
+                analysis_result(compat_scores[row], traction_scores[row], preferred, similarities[row])
+                for row in range(len(startups))
+            ],
+            "invalid_indices": np.flatnonzero(invalid_rows).tolist(),
+            "count": len(startups),
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in analyze_batch: {str(e)}")
+        metrics.observe_error('analyze_batch')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "results": []}
+
+# Binary float32 protocol (see raw_protocol.py) for internal callers that
+# already hold feature vectors: no JSON, no pydantic, no TF-IDF
+def score_feature_matrix(X, expected_features, predict, endpoint, timer):
+    """Scores for a decoded feature matrix; rows with NaN features score NaN"""
+    if X.shape[1] != expected_features:
+        metrics.observe_rejections(endpoint, 'dimension_mismatch', X.shape[0])
+        raise ScoringError(f"Feature dimension mismatch. Expected {expected_features}, got {X.shape[1]}")
+    invalid_rows = np.isnan(X).any(axis=1)
+    scores = np.full(X.shape[0], np.nan, dtype=np.float32)
+    if not invalid_rows.all():
+        with timer.stage('predict'):
+            scores[~invalid_rows] = predict(X[~invalid_rows] if invalid_rows.any() else X)
+    metrics.observe_rejections(endpoint, 'nan_input', int(invalid_rows.sum()))
+    return scores, invalid_rows
+
+async def raw_scoring_response(request, endpoint, expected_features, predict, models):
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        X = raw_protocol.decode_matrix(await request.body())
+    except ValueError as e:
+        log_request(endpoint, started, status='rejected', error=str(e), level=logging.WARNING)
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    # Model code runs in the threadpool, off the event loop
+    try:
+        scores, invalid_rows = await run_in_threadpool(score_feature_matrix, X, expected_features, predict, endpoint, timer)
+    except ScoringError as e:
+        log_request(endpoint, started, status='rejected', error=str(e), level=logging.WARNING)
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    log_request(endpoint, started, timer.stages, status='ok', batch_size=len(scores), invalid=int(invalid_rows.sum()))
+    return Response(
+        content=raw_protocol.encode_scores(scores),
+        media_type=raw_protocol.CONTENT_TYPE,
+        headers={"X-Invalid-Rows": str(int(invalid_rows.sum()))}
+    )
+
+@app.post("/predict_compatibility_raw/")
+async def predict_compatibility_raw(request: Request, models=Depends(get_models)):
+    """Score a packed float32 matrix of combined investor + startup feature rows"""
+    try:
+        return await raw_scoring_response(request, 'predict_compatibility_raw', models.compat_features,
+                                          models.compat_proba, models)
+    except Exception as e:
+        logger.error(f"Error in predict_compatibility_raw: {str(e)}")
+        metrics.observe_error('predict_compatibility_raw')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.post("/predict_traction_raw/")
+async def predict_traction_raw(request: Request, models=Depends(get_models)):
+    """Score a packed float32 matrix of startup traction feature rows"""
+    try:
+        return await raw_scoring_response(request, 'predict_traction_raw', models.traction_features,
+                                          models.traction_model.predict, models)
+    except Exception as e:
+        logger.error(f"Error in predict_traction_raw: {str(e)}")
+        metrics.observe_error('predict_traction_raw')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+# Bulk NDJSON scoring for offline jobs: the body is spooled to a temporary
+# file (in memory up to BULK_SPOOL_BYTES), then scored and streamed back
+# chunk by chunk, so memory does not grow with the number of pairs
+BULK_CHUNK_SIZE = int(os.environ.get('RECOMMENDER_BULK_CHUNK_SIZE', bulk_scoring.DEFAULT_CHUNK_SIZE))
+BULK_SPOOL_BYTES = 8 * 1024 * 1024
+
+def stream_bulk_results(spool, models, started):
+    """NDJSON result chunks for the spooled pairs; runs in the threadpool as the response is sent"""
+    pairs = 0
+    try:
+        for text in bulk_scoring.score_lines(spool, models, BULK_CHUNK_SIZE):
+            pairs += text.count('\n')
+            yield text
+        log_request('predict_compatibility_bulk', started, status='ok', batch_size=pairs)
+    except Exception as e:
+        logger.error(f"Error in predict_compatibility_bulk: {str(e)}")
+        metrics.observe_error('predict_compatibility_bulk')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        yield json.dumps({"error": str(e), "scored": pairs}) + '\n'
+    finally:
+        spool.close()
+
+@app.post("/predict_compatibility_bulk/")
+async def predict_compatibility_bulk(request: Request, models=Depends(get_models)):
+    """Score an NDJSON body of {"id", "investor", "startup"} pairs, streaming NDJSON results in input order"""
+    started = time.perf_counter()
+    spool = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES, mode='w+b')
+    try:
+        async for data in request.stream():
+            spool.write(data)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    return StreamingResponse(stream_bulk_results(spool, models, started), media_type='application/x-ndjson')
+
+# Startup catalog for top-K retrieval
+CATALOG_PATH = os.environ.get('RECOMMENDER_CATALOG_PATH', 'dummy_startups.json')
+RECOMMEND_MIN_CANDIDATES = 200
+# Startups re-vectorized per batch when a reload changes the feature version
+CATALOG_CHUNK_SIZE = 1024
+# First-pass mode -> key of its score in each recommendation
+RECOMMEND_FIRST_PASSES = {'similarity': 'similarity', 'surrogate': 'surrogate_log_odds'}
+
+def add_to_catalog(catalog, ids, startups, models):
+    """Vectorize startups and upsert them into the catalog (bypasses the feature cache)"""
+    startup_mat_compat, _ = vectorize_startups(startups, models)
+    return catalog.upsert(ids, startup_mat_compat, startup_index_rows(startup_mat_compat), startups)
+
+def catalog_projections(models):
+    """Per-startup values the optional models need at query time, computed when a startup is added"""
+    projections = {}
+    surrogate = models.compat_surrogate
+    if surrogate is not None:
+        projections['surrogate'] = (surrogate.project_startups, surrogate.rank)
+    engine = models.suggestion_engine
+    if engine is not None:
+        # PCA projection followed by the distance to the nearest cluster centroid
+        def project_novelty(compat_rows):
+            startup_reduced, cluster_dists = engine.project_startups(compat_rows)
+            return np.hstack([startup_reduced, cluster_dists[:, None]])
+        projections['novelty'] = (project_novelty, engine.startup_pca.n_components_ + 1)
+    return projections
+
+def build_catalog(models):
+    """Build the catalog for a freshly loaded ModelSet; it is published along with the models.
+
+    The first catalog is loaded from CATALOG_PATH. A reload takes over the
+    current catalog instead, so startups added through /catalog/startups/
+    are kept.
+    """
+    catalog = StartupCatalog(models.startup_compat_features, INDEX_FEATURES, projections=catalog_projections(models))
+    current = registry.get()
+    if current is None and os.path.exists(CATALOG_PATH):
+        try:
+            load_catalog_file(catalog, CATALOG_PATH, models)
+        except Exception as e:
+            logger.error(f"Failed to load startup catalog from {CATALOG_PATH}: {str(e)}")
+    # Registered startups are part of the catalog too
+    startup_ids = models.startup_store.ids()
+    if startup_ids:
+        startup_mat, _ = models.startup_store.lookup(startup_ids)
+        startup_mat_compat = startup_mat[:, :models.startup_compat_features]
+        records = [StartupInput(**models.startup_store.record(startup_id)) for startup_id in startup_ids]
+        catalog.upsert(startup_ids, startup_mat_compat, startup_index_rows(startup_mat_compat), records)
+    if current is not None:
+        sequence = carry_over_catalog(catalog, current, models)
+        # Again for startups the current models added meanwhile
+        carry_over_catalog(catalog, current, models, sequence)
+        logger.info(f"Carried {len(catalog)} startups over into the new catalog")
+    return catalog
+
+def carry_over_catalog(catalog, current, models, sequence=0):
+    """Copy the current catalog's rows written after `sequence` into `catalog`; returns the new sequence.
+
+    Rows are re-vectorized from their inputs when the feature version changed.
+    """
+    ids, records, compat_rows, index_rows, sequence = current.catalog.entries_since(sequence)
+    if not ids:
+        return sequence
+    if current.feature_version == models.feature_version:
+        catalog.upsert(ids, compat_rows, index_rows, records)
+    else:
+        for start in range(0, len(ids), CATALOG_CHUNK_SIZE):
+            chunk = slice(start, start + CATALOG_CHUNK_SIZE)
+            add_to_catalog(catalog, ids[chunk], records[chunk], models)
+    return sequence
+
+def load_catalog_file(catalog, path, models):
+    """Load startups from a JSON records file such as dummy_startups.json"""
+    with open(path, 'r') as f:
+        records = json.load(f)
+    startups = []
+    for record in records:
+        record = dict(record)
+        record['id'] = str(record['id'])
+        record['founding_date'] = str(record.get('founding_date', ''))
+        startups.append(CatalogStartupInput(**record))
+    added = add_to_catalog(catalog, [s.id for s in startups], startups, models)
+    logger.info(f"Loaded {len(startups)} startups from {path} into catalog ({added} new)")
+    return added
+
+@app.post("/catalog/startups/")
+def add_catalog_startups(startups: List[CatalogStartupInput], models=Depends(get_models)):
+    """Add or update startups in the recommendation catalog"""
+    try:
+        added = add_to_catalog(models.catalog, [s.id for s in startups], startups, models) if startups else 0
+        return {"added": added, "updated": len(startups) - added, "catalog_size": len(models.catalog)}
+    except Exception as e:
+        logger.error(f"Error in add_catalog_startups: {str(e)}")
+        metrics.observe_error('add_catalog_startups')
+        return {"error": str(e), "catalog_size": len(models.catalog)}
+
+@app.get("/catalog/")
+async def catalog_info(models=Depends(get_models)):
+    """Get the size and layout of the startup catalog"""
+    return {
+        "catalog_size": len(models.catalog),
+        "compat_features": models.catalog.compat_width,
+        "index_features": models.catalog.index_width
+    }
+
+@app.post("/recommend/{k}")
+def recommend(k: int, investor: InvestorInput, candidates: int = 0, explain: bool = False,
+              first_pass: str = 'similarity', models=Depends(get_models)):
+    """Top-k catalog startups for an investor.
+
+    A first pass over the whole catalog picks a shortlist of
+    `candidates` startups (default max(10*k, 200)), which is then
+    re-ranked with the compatibility model. The first pass is a cosine
+    search, or with `first_pass=surrogate` the distilled compatibility
+    surrogate (see surrogate.py). With `explain`, each recommendation
+    carries its feature contributions.
+    """
+    try:
+        if k <= 0:
+            return {"error": "k must be positive", "recommendations": []}
+        if first_pass not in RECOMMEND_FIRST_PASSES:
+            return {"error": f"first_pass must be one of {list(RECOMMEND_FIRST_PASSES)}", "recommendations": []}
+        if first_pass == 'surrogate' and models.compat_surrogate is None:
+            return {"error": "No compatibility surrogate loaded (compat_surrogate.joblib)", "recommendations": []}
+        started = time.perf_counter()
+        timer = StageTimer()
+        with timer.stage('preprocess'):
+            investor_vec = get_investor_vector(investor, models, timer)
+        catalog = models.catalog
+
+        # First pass: similarity search or surrogate scores over the full catalog
+        n_candidates = max(candidates, k) if candidates > 0 else max(10 * k, RECOMMEND_MIN_CANDIDATES)
+        if first_pass == 'surrogate':
+            weights, offset = models.compat_surrogate.startup_weights(investor_vec)
+            rows, first_pass_scores = catalog.projected_search('surrogate', weights, n_candidates)
+            first_pass_scores = first_pass_scores + offset
+        else:
+            rows, first_pass_scores = catalog.search(investor_query_vector(investor_vec, models), n_candidates)
+        search_done = time.perf_counter()
+        if len(rows) == 0:
+            return {"recommendations": [], "catalog_size": 0}
+
+        # Second pass: re-rank the shortlist with the compatibility model
+        combined_mat = np.empty((len(rows), models.compat_features), dtype=np.float32)
+        combined_mat[:, :INVESTOR_FEATURES] = investor_vec
+        combined_mat[:, INVESTOR_FEATURES:] = catalog.compat_rows(rows)
+        scores = models.compat_proba(combined_mat)
+        scores = np.nan_to_num(scores, nan=0.0)
+        top = np.argsort(-scores, kind='stable')[:k]
+        rerank_done = time.perf_counter()
+        timer.stages['search'] = (search_done - started) * 1000 - timer.stages['preprocess']
+        timer.stages['predict'] = (rerank_done - search_done) * 1000
+        explanations = None
+        if explain:
+            with timer.stage('explain'):
+                explanations = explain_compatibility_rows(combined_mat[top], models, RECOMMEND_EXPLAIN_FEATURES)
+        log_request('recommend', started, timer.stages, status='ok', k=k, candidates=len(rows))
+
+        ids = catalog.ids_for(rows[top])
+        first_pass_key = RECOMMEND_FIRST_PASSES[first_pass]
+        recommendations = [
+            {
+                "id": startup_id,
+                "compatibility_score": float(scores[i]),
+                first_pass_key: float(first_pass_scores[i])
+            }
+            for startup_id, i in zip(ids, top)
+        ]
+        if explanations is not None:
+            for recommendation, explanation in zip(recommendations, explanations):
+                recommendation["explanation"] = explanation
+        return {
+            "recommendations": recommendations,
+            "catalog_size": len(catalog),
+            "candidates": len(rows),
+            "first_pass": first_pass,
+            "search_ms": (search_done - started) * 1000,
+            "rerank_ms": (rerank_done - search_done) * 1000,
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in recommend: {str(e)}")
+        metrics.observe_error('recommend')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "recommendations": []}
+
+@app.post("/novel_suggestions/{n}")
+def novel_suggestions(n: int, investor: InvestorInput, models=Depends(get_models)):
+    """Catalog startups that are the most novel for an investor.
+
+    Novelty combines a startup's distance to its cluster centroid with its
+    distance from the investor in the suggestion engine's PCA space.
+    Catalog projections are computed when startups are added, so a
+    request only projects the investor.
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        if n <= 0:
+            return {"error": "n must be positive", "suggestions": []}
+        engine = models.suggestion_engine
+        if engine is None:
+            return {"error": "No suggestion engine loaded (suggestion_engine.joblib)", "suggestions": []}
+        with timer.stage('preprocess'):
+            investor_vec = get_investor_vector(investor, models, timer)
+        catalog = models.catalog
+        with timer.stage('predict'):
+            projected = catalog.projected_rows('novelty')
+            scores = engine.novelty_scores(investor_vec, projected[:, :-1], projected[:, -1])
+            top = top_n_indices(scores, n)
+        log_request('novel_suggestions', started, timer.stages, status='ok', n=n, catalog_size=len(projected))
+
+        return {
+            "suggestions": [
+                {"id": startup_id, "novelty_score": float(scores[row])}
+                for startup_id, row in zip(catalog.ids_for(top), top)
+            ],
+            "catalog_size": len(projected),
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in novel_suggestions: {str(e)}")
+        metrics.observe_error('novel_suggestions')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "suggestions": []}
+
+# Registered investors and startups (see entity_store.py): features are
+# computed once at registration, and the by-ID endpoints only look up rows.
+# Every worker process follows the stores' logs, so a registration made in
+# one worker is seen by the others on their next lookup
+ENTITY_STORE_DIR = os.environ.get('RECOMMENDER_ENTITY_STORE_DIR', 'entity_store')
+
+def vectorize_registered_investors(investors, models):
+    return sparse_investor_rows(investors, models).toarray()
+
+def vectorize_registered_startups(startups, models):
+    """One row per startup: compat features followed by traction features"""
+    startup_mat_compat, startup_mat_traction = vectorize_startups(startups, models)
+    return np.concatenate([startup_mat_compat, startup_mat_traction], axis=1)
+
+def open_entity_stores(models):
+    """Attach the entity stores to a freshly loaded ModelSet.
+
+    A reload with an unchanged feature version shares the current set's
+    stores, so registrations never split between two store objects;
+    otherwise the stores are rebuilt from their logged inputs.
+    """
+    current = registry.get()
+    if current is not None and current.feature_version == models.feature_version:
+        models.investor_store, models.startup_store = current.investor_store, current.startup_store
+        return
+    models.investor_store = EntityStore(
+        ENTITY_STORE_DIR, 'investors', INVESTOR_FEATURES, models.feature_version,
+        lambda records: vectorize_registered_investors([InvestorInput(**record) for record in records], models))
+    models.startup_store = EntityStore(
+        ENTITY_STORE_DIR, 'startups', models.startup_compat_features + models.startup_traction_features,
+        models.feature_version,
+        lambda records: vectorize_registered_startups([StartupInput(**record) for record in records], models))
+
+@app.on_event("shutdown")
+def flush_entity_stores():
+    models = registry.get()
+    if models is not None and models.investor_store is not None:
+        models.investor_store.flush()
+        models.startup_store.flush()
+
+@app.post("/investors/")
+def register_investors(investors: List[RegisteredInvestorInput], models=Depends(get_models)):
+    """Register or update investors; only the given investors are re-vectorized"""
+    try:
+        added = 0
+        if investors:
+            added = models.investor_store.upsert(
+                [investor.id for investor in investors],
+                [investor.model_dump(exclude={'id'}) for investor in investors],
+                vectorize_registered_investors(investors, models))
+        return {"added": added, "updated": len(investors) - added, "investor_count": len(models.investor_store)}
+    except Exception as e:
+        logger.error(f"Error in register_investors: {str(e)}")
+        metrics.observe_error('register_investors')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "investor_count": len(models.investor_store)}
+
+@app.post("/startups/")
+def register_startups(startups: List[CatalogStartupInput], models=Depends(get_models)):
+    """Register or update startups; they are also added to the recommendation catalog"""
+    try:
+        added = 0
+        if startups:
+            ids = [startup.id for startup in startups]
+            startup_mat = vectorize_registered_startups(startups, models)
+            added = models.startup_store.upsert(ids, [startup.model_dump(exclude={'id'}) for startup in startups], startup_mat)
+            startup_mat_compat = startup_mat[:, :models.startup_compat_features]
+            models.catalog.upsert(ids, startup_mat_compat, startup_index_rows(startup_mat_compat), startups)
+        return {"added": added, "updated": len(startups) - added, "startup_count": len(models.startup_store)}
+    except Exception as e:
+        logger.error(f"Error in register_startups: {str(e)}")
+        metrics.observe_error('register_startups')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "startup_count": len(models.startup_store)}
+
+@app.get("/entities/")
+async def entity_info(models=Depends(get_models)):
+    """Get the size and layout of the registered entity stores"""
+    return {
+        "investors": models.investor_store.stats(),
+        "startups": models.startup_store.stats()
+    }
+
+def scores_by_id(known, known_scores):
+    """Scores in request order, 0.0 for unknown ids and invalid rows"""
+    scores = np.zeros(len(known), dtype=np.float64)
+    scores[known] = np.nan_to_num(known_scores, nan=0.0)
+    return scores.tolist()
+
+@app.post("/predict_compatibility_by_id/")
+def predict_compatibility_by_id(request: CompatibilityByIdRequest, models=Depends(get_models)):
+    """Score a registered investor against registered startups.
+
+    Scores are returned in the same order as `startup_ids`; unknown
+    startups score 0.0 and are listed in `unknown_ids`.
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        with timer.stage('lookup'):
+            investor_mat, _ = models.investor_store.lookup([request.investor_id])
+            startup_mat, known = models.startup_store.lookup(request.startup_ids)
+        unknown_ids = [startup_id for startup_id, found in zip(request.startup_ids, known) if not found]
+        if len(investor_mat) == 0:
+            log_request('predict_compatibility_by_id', started, timer.stages, status='rejected', error='unknown investor')
+            return {"error": f"Unknown investor ID: {request.investor_id}",
+                    "compatibility_scores": [0.0] * len(request.startup_ids)}
+
+        combined_mat = np.empty((len(startup_mat), models.compat_features), dtype=np.float32)
+        combined_mat[:, :INVESTOR_FEATURES] = investor_mat[0]
+        combined_mat[:, INVESTOR_FEATURES:] = startup_mat[:, :models.startup_compat_features]
+        invalid_rows = np.isnan(combined_mat).any(axis=1)
+        scores = np.full(len(startup_mat), np.nan)
+        if not invalid_rows.all():
+            with timer.stage('predict'):
+                scores[~invalid_rows] = models.compat_proba(combined_mat[~invalid_rows])
+        metrics.observe_rejections('predict_compatibility_by_id', 'nan_input', int(invalid_rows.sum()))
+        log_request('predict_compatibility_by_id', started, timer.stages, status='ok',
+                    batch_size=len(request.startup_ids), unknown=len(unknown_ids))
+
+        return {
+            "compatibility_scores": scores_by_id(known, scores),
+            "unknown_ids": unknown_ids,
+            "count": len(request.startup_ids),
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in predict_compatibility_by_id: {str(e)}")
+        metrics.observe_error('predict_compatibility_by_id')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "compatibility_scores": [0.0] * len(request.startup_ids)}
+
+@app.post("/predict_traction_by_id/")
+def predict_traction_by_id(request: TractionByIdRequest, models=Depends(get_models)):
+    """Traction scores for registered startups, in the same order as `startup_ids`"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        with timer.stage('lookup'):
+            startup_mat, known = models.startup_store.lookup(request.startup_ids)
+        unknown_ids = [startup_id for startup_id, found in zip(request.startup_ids, known) if not found]
+        startup_mat_traction = startup_mat[:, models.startup_compat_features:]
+        invalid_rows = np.isnan(startup_mat_traction).any(axis=1)
+        scores = np.full(len(startup_mat), np.nan)
+        if not invalid_rows.all():
+            with timer.stage('predict'):
+                scores[~invalid_rows] = models.traction_model.predict(startup_mat_traction[~invalid_rows])
+        metrics.observe_rejections('predict_traction_by_id', 'nan_input', int(invalid_rows.sum()))
+        log_request('predict_traction_by_id', started, timer.stages, status='ok',
+                    batch_size=len(request.startup_ids), unknown=len(unknown_ids))
+
+        return {
+            "traction_scores": scores_by_id(known, scores),
+            "unknown_ids": unknown_ids,
+            "count": len(request.startup_ids),
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in predict_traction_by_id: {str(e)}")
+        metrics.observe_error('predict_traction_by_id')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "traction_scores": [0.0] * len(request.startup_ids)}
+
+# Next-interaction prediction with the investment history model (LSTM).
+# Each investor's last seq_length interactions are kept in a ring buffer
+# (see history_buffer.py) that follows a log next to the entity stores, so
+# all workers share it; investor preferences come from the entity store
+def open_history_buffer(models):
+    """Attach the history buffer, shared with the current set while the window length is unchanged"""
+    if models.history_model is None:
+        return
+    current = registry.get()
+    if current is not None and current.history_buffer is not None \
+            and current.history_buffer.seq_length == models.history_seq_length:
+        models.history_buffer = current.history_buffer
+        return
+    models.history_buffer = HistoryBuffer(models.history_seq_length,
+                                          log_path=os.path.join(ENTITY_STORE_DIR, 'interactions.log.ndjson'))
+
+@app.post("/interactions/")
+def record_interactions(interactions: List[InteractionInput], models=Depends(get_models)):
+    """Append interactions of registered investors to their history windows.
+
+    The startup is given inline or as the ID of a registered startup.
+    """
+    try:
+        if models.history_buffer is None:
+            return {"error": "No history model loaded (history_model.joblib)", "appended": 0}
+        rejected, investor_ids, rows = [], [], []
+        for index, interaction in enumerate(interactions):
+            investor = models.investor_store.record(interaction.investor_id)
+            if interaction.startup is not None:
+                startup = interaction.startup.model_dump()
+            elif interaction.startup_id is not None:
+                startup = models.startup_store.record(interaction.startup_id)
+            else:
+                startup = None
+            if investor is None:
+                rejected.append({"index": index, "error": f"Unknown investor ID: {interaction.investor_id}"})
+            elif startup is None:
+                rejected.append({"index": index, "error": "Startup missing or not registered"})
+            else:
+                investor_ids.append(interaction.investor_id)
+                rows.append(interaction_row(
+                    investor['preferred_sectors'], investor['preferred_stages'], startup, interaction.interacted))
+        models.history_buffer.extend(investor_ids, rows)
+        return {
+            "appended": len(interactions) - len(rejected),
+            "rejected": rejected,
+            "investors_tracked": len(models.history_buffer)
+        }
+    except Exception as e:
+        logger.error(f"Error in record_interactions: {str(e)}")
+        metrics.observe_error('record_interactions')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "appended": 0}
+
+@app.post("/predict_next_interaction/")
+async def predict_next_interaction(request: NextInteractionRequest, models=Depends(get_models)):
+    """Probability that each investor's next interaction is positive.
+
+    Investors need seq_length recorded interactions. Windows of concurrent
+    requests are predicted together on the history scheduler.
+    """
+    started = time.perf_counter()
+    try:
+        if models.history_model is None:
+            return {"error": "No history model loaded (history_model.joblib)", "predictions": []}
+        seq_length = models.history_seq_length
+        windows, counts = models.history_buffer.windows(request.investor_ids)
+        ready = counts >= seq_length
+        probabilities = np.full(len(request.investor_ids), np.nan)
+        batch_size = 0
+        if ready.any():
+            probabilities[ready], batch_size = await history_scheduler.submit((models, windows[ready]))
+        metrics.observe_rejections('predict_next_interaction', 'short_history', int((~ready).sum()))
+        log_request('predict_next_interaction', started, status='ok',
+                    investors=len(request.investor_ids), batch_size=batch_size)
+
+        predictions = []
+        for investor_id, count, is_ready, probability in zip(request.investor_ids, counts, ready, probabilities):
+            prediction = {"investor_id": investor_id, "history_length": int(min(count, seq_length))}
+            if is_ready:
+                prediction["next_interaction_probability"] = float(probability)
+            else:
+                prediction["error"] = f"Needs {seq_length} recorded interactions, has {int(count)}"
+            predictions.append(prediction)
+        return {"predictions": predictions, "seq_length": seq_length, "model_version": models.version}
+    except Exception as e:
+        logger.error(f"Error in predict_next_interaction: {str(e)}")
+        metrics.observe_error('predict_next_interaction')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "predictions": []}
+
+# Feature contributions (TreeSHAP, see explain.py) in log-odds for
+# compatibility and in score units for traction
+RECOMMEND_EXPLAIN_FEATURES = 5
+
+def explain_compatibility_rows(combined_mat, models, top_n):
+    """Summarized contributions for each combined feature row, or None if the model cannot be explained"""
+    explainer = models.compat_explainer
+    if explainer is None:
+        return None
+    contributions = explainer.shap_values(combined_mat)
+    return [summarize(row, explainer.expected_value, models.compat_layout, top_n) for row in contributions]
+
+@app.post("/explain_compatibility/")
+def explain_compatibility(investor: InvestorInput, startup: StartupInput, top_n: int = 10, models=Depends(get_models)):
+    """Compatibility score with per-feature and per-block contributions"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        with timer.stage('preprocess'):
+            investor_vec, (startup_compat, _) = preprocess_input(investor, startup, models)
+            combined_mat = np.concatenate([investor_vec, startup_compat]).reshape(1, -1)
+        if np.isnan(combined_mat).any():
+            metrics.observe_rejections('explain_compatibility', 'nan_input')
+            return {"error": "Invalid input values detected", "compatibility_score": 0.0}
+
+        with timer.stage('explain'):
+            explanations = explain_compatibility_rows(combined_mat, models, top_n)
+        if explanations is None:
+            return {"error": "Compatibility model does not support explanations", "compatibility_score": 0.0}
+        log_request('explain_compatibility', started, timer.stages, status='ok')
+
+        return {
+            "compatibility_score": float(models.compat_proba(combined_mat)[0]),
+            "explanation": explanations[0],
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in explain_compatibility: {str(e)}")
+        metrics.observe_error('explain_compatibility')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "compatibility_score": 0.0}
+
+@app.post("/explain_traction/")
+def explain_traction(startup: StartupInput, top_n: int = 10, models=Depends(get_models)):
+    """Traction score with per-feature and per-block contributions"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    try:
+        with timer.stage('preprocess'):
+            _, (_, startup_traction) = preprocess_input(None, startup, models)
+            traction_mat = startup_traction.reshape(1, -1)
+        if np.isnan(traction_mat).any():
+            metrics.observe_rejections('explain_traction', 'nan_input')
             return {"error": "Invalid input values detected", "traction_score": 0.0}
-        
-        # Reshape and predict
-        reshaped_vec = startup_vec_traction.reshape(1, -1)
-        logger.info(f"Making prediction with vector shape: {reshaped_vec.shape}")
-        
-        # Get model prediction
-        traction_score = float(traction_model.predict(reshaped_vec)[0])
-        logger.info(f"Prediction complete. Score: {traction_score}")
-        
-        if np.isnan(traction_score):
-            logger.error("Model produced NaN score")
-            return {"error": "Model produced invalid score", "traction_score": 0.0}
+
+        with timer.stage('explain'):
+            contributions, expected_values = traction_shap_values(models.traction_model, traction_mat)
+            explanation = summarize(contributions[0], expected_values[0], models.traction_layout, top_n)
+        log_request('explain_traction', started, timer.stages, status='ok')
+
+        return {
+            "traction_score": float(models.traction_model.predict(traction_mat)[0]),
+            "explanation": explanation,
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in explain_traction: {str(e)}")
+        metrics.observe_error('explain_traction')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "traction_score": 0.0}
+
+@app.post("/predict_traction/")
+async def predict_traction(startup: StartupInput, models=Depends(get_models)):
+    started = time.perf_counter()
+    try:
+        # Preprocessing and prediction run batched on a scheduler worker
+        try:
+            key = f"{models.version}:{canonical_key(startup)}"
+            traction_score, stages, batch_size = await traction_flight.run(
+                key, lambda: traction_scheduler.submit((models, startup)))
+        except ScoringError as e:
+            log_request('predict_traction', started, status='rejected', error=str(e), level=logging.WARNING)
+            return {"error": str(e), "traction_score": 0.0}
+
+        debug = {"startup": startup.model_dump()} if should_sample() else None
+        log_request('predict_traction', started, stages, status='ok', batch_size=batch_size,
+                    score=traction_score, debug=debug)
             
         return {
             "traction_score": traction_score,
-            "features_used": startup_vec_traction.shape[0]
+            "features_used": models.traction_features,
+            "model_version": models.version
         }
     except Exception as e:
         logger.error(f"Error in predict_traction: {str(e)}")
+        metrics.observe_error('predict_traction')
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return {"error": str(e), "traction_score": 0.0}
 
 @app.get("/test_features/")
-async def test_features():
+def test_features(models=Depends(get_models)):
     """Test endpoint to verify feature dimensions"""
     try:
         # Create test data
-        test_investor = InvestorInput(
-            type="VC",
-            location="Test",
-            avg_check_size=1000000,
-            min_roi=3.0,
-            risk_appetite=5.0,
-            years_active=5.0,
-            total_investments=10000000,
-            preferred_sectors=["Tech"],
-            preferred_stages=["Seed"],
-            thesis="Test thesis for testing feature generation."
-        )
-        
-        test_startup = StartupInput(
-            sector="Tech",
-            stage="Seed",
-            location="Test",
-            founding_date="2023-01-01",
-            employees=10,
-            mrr=50000,
-            growth_rate=0.15,
-            burn_rate=0.1,
-            funding_to_date=500000,
-            description="Test startup description for testing feature generation.",
-            last_valuation=2000000
-        )
+        test_investor = sample_investor()
+        test_startup = sample_startup()
         
         # Generate features
-        investor_vec, (startup_compat, startup_traction) = preprocess_input(test_investor, test_startup)
+        investor_vec, (startup_compat, startup_traction) = preprocess_input(test_investor, test_startup, models)
         
         return {
             "investor_vector_shape": investor_vec.shape[0],
             "startup_compat_shape": startup_compat.shape[0],
             "startup_traction_shape": startup_traction.shape[0],
             "combined_compat_shape": investor_vec.shape[0] + startup_compat.shape[0],
-            "expected_compat": COMPAT_EXPECTED_FEATURES,
-            "expected_traction": TRACTION_EXPECTED_FEATURES,
-            "compat_match": (investor_vec.shape[0] + startup_compat.shape[0]) == COMPAT_EXPECTED_FEATURES,
-            "traction_match": startup_traction.shape[0] == TRACTION_EXPECTED_FEATURES
+            "expected_compat": models.compat_features,
+            "expected_traction": models.traction_features,
+            "compat_match": (investor_vec.shape[0] + startup_compat.shape[0]) == models.compat_features,
+            "traction_match": startup_traction.shape[0] == models.traction_features
         }
         
     except Exception as e:
         logger.error(f"Error in test_features: {str(e)}")
+        metrics.observe_error('test_features')
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return {"error": str(e)}
 
 @app.get("/sector_similarity/")
-async def sector_similarity(sector1: str, sector2: str):
+async def sector_similarity(sector1: str, sector2: str, models=Depends(get_models)):
+    started = time.perf_counter()
     try:
-        logger.info(f"Processing sector similarity between {sector1} and {sector2}")
-        
         # Validate sectors
         if sector1 not in SECTORS or sector2 not in SECTORS:
             invalid_sectors = [s for s in [sector1, sector2] if s not in SECTORS]
             return {"error": f"Invalid sector(s): {', '.join(invalid_sectors)}", "similarity_score": 0.0}
-            
-        # Get similarity score - handle different model types
-        try:
-            if hasattr(industry_model, 'get_sector_similarity'):
-                similarity = industry_model.get_sector_similarity(sector1, sector2)
-            elif hasattr(industry_model, 'wv') and hasattr(industry_model.wv, 'similarity'):
-                # Word2Vec model
-                similarity = (1 + industry_model.wv.similarity(sector1, sector2)) / 2
-            else:
-                similarity = 0.5  # Default
-                
-            similarity_float = float(similarity)
-            
-            if np.isnan(similarity_float):
-                logger.error("Model produced NaN similarity score")
-                return {"error": "Invalid similarity score", "similarity_score": 0.0}
-                
-            logger.info(f"Similarity calculation complete. Score: {similarity_float}")
-            return {"similarity_score": similarity_float}
-            
-        except Exception as model_error:
-            logger.error(f"Error in similarity calculation: {model_error}")
-            return {"error": str(model_error), "similarity_score": 0.5}
-        
+
+        # Served from the matrix computed when the models were loaded
+        similarity_float = float(models.sector_matrix[SECTOR_INDEX[sector1], SECTOR_INDEX[sector2]])
+
+        if np.isnan(similarity_float):
+            logger.error("Model produced NaN similarity score")
+            metrics.observe_rejections('sector_similarity', 'invalid_score')
+            return {"error": "Invalid similarity score", "similarity_score": 0.0}
+
+        log_request('sector_similarity', started, status='ok', score=similarity_float)
+        return {"similarity_score": similarity_float, "model_version": models.version}
+
     except Exception as e:
         logger.error(f"Error in sector_similarity: {str(e)}")
+        metrics.observe_error('sector_similarity')
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return {"error": str(e), "similarity_score": 0.0}
 
+@app.get("/sector_similarity_matrix/")
+async def sector_similarity_matrix(request: Request, models=Depends(get_models)):
+    """Similarity between every pair of sectors, rows and columns in `sectors` order.
+
+    The matrix only changes with the models, so the response carries the
+    model version as its ETag and can be cached by clients.
+    """
+    etag = f'"{models.version}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    matrix = np.where(np.isnan(models.sector_matrix), 0.0, models.sector_matrix)
+    return JSONResponse(headers=headers, content={
+        "sectors": SECTORS,
+        "matrix": matrix.tolist(),
+        "model_version": models.version
+    })
+
+@app.post("/sector_similarity_batch/")
+async def sector_similarity_batch(pairs: List[SectorPair], models=Depends(get_models)):
+    """Score a list of sector pairs in one call; scores are in the order of `pairs`"""
+    started = time.perf_counter()
+    try:
+        rows = np.array([SECTOR_INDEX.get(pair.sector1, -1) for pair in pairs], dtype=np.intp)
+        cols = np.array([SECTOR_INDEX.get(pair.sector2, -1) for pair in pairs], dtype=np.intp)
+        valid = (rows >= 0) & (cols >= 0)
+        scores = np.zeros(len(pairs), dtype=np.float64)
+        scores[valid] = models.sector_matrix[rows[valid], cols[valid]]
+
+        # Unknown sectors and NaN similarities score 0.0 and are reported
+        invalid_rows = ~valid | np.isnan(scores)
+        scores[invalid_rows] = 0.0
+        metrics.observe_rejections('sector_similarity_batch', 'invalid_sector', int((~valid).sum()))
+        metrics.observe_rejections('sector_similarity_batch', 'invalid_score', int((invalid_rows & valid).sum()))
+        log_request('sector_similarity_batch', started, status='ok', batch_size=len(pairs),
+                    invalid=int(invalid_rows.sum()))
+
+        return {
+            "similarity_scores": scores.tolist(),
+            "invalid_indices": np.flatnonzero(invalid_rows).tolist(),
+            "count": len(pairs),
+            "model_version": models.version
+        }
+    except Exception as e:
+        logger.error(f"Error in sector_similarity_batch: {str(e)}")
+        metrics.observe_error('sector_similarity_batch')
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {"error": str(e), "similarity_scores": [0.0] * len(pairs)}
+
+# Scrape-time gauges for /metrics
+metrics.register_gauge(
+    'recommender_feature_cache_hit_ratio', 'Feature cache hit ratio since startup', ('cache',),
+    lambda: {('investor',): investor_cache.stats()['hit_ratio'], ('startup',): startup_cache.stats()['hit_ratio']}
+)
+metrics.register_gauge(
+    'recommender_feature_cache_entries', 'Entries held by each feature cache', ('cache',),
+    lambda: {('investor',): investor_cache.stats()['size'], ('startup',): startup_cache.stats()['size']}
+)
+metrics.register_gauge(
+    'recommender_scheduler_mean_batch_size', 'Mean micro-batch size since startup', ('scheduler',),
+    lambda: {('compatibility',): compat_scheduler.stats()['mean_batch_size'],
+             ('traction',): traction_scheduler.stats()['mean_batch_size'],
+             ('history',): history_scheduler.stats()['mean_batch_size']}
+)
+metrics.register_gauge(
+    'recommender_scheduler_largest_batch_size', 'Largest micro-batch since startup', ('scheduler',),
+    lambda: {('compatibility',): compat_scheduler.largest_batch, ('traction',): traction_scheduler.largest_batch,
+             ('history',): history_scheduler.largest_batch}
+)
+metrics.register_gauge(
+    'recommender_scheduler_queue_depth', 'Items waiting for a scheduler worker', ('scheduler',),
+    lambda: {('compatibility',): compat_scheduler.stats()['queued'], ('traction',): traction_scheduler.stats()['queued'],
+             ('history',): history_scheduler.stats()['queued']}
+)
+metrics.register_gauge(
+    'recommender_catalog_size', 'Startups in the recommendation catalog', (),
+    lambda: {(): len(registry.get().catalog) if registry.get() is not None else 0}
+)
+metrics.register_gauge(
+    'recommender_entity_store_size', 'Registered entities in each entity store', ('store',),
+    lambda: {('investors',): len(registry.get().investor_store), ('startups',): len(registry.get().startup_store)}
+    if registry.get() is not None else {}
+)
+metrics.register_gauge(
+    'recommender_models_ready', '1 once models are loaded and warmed up', (),
+    lambda: {(): int(registry.ready)}
+)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/model_info/")
-async def model_info():
+async def model_info(models=Depends(get_models)):
     """Get information about loaded models"""
     try:
         info = {
-            "compatibility_model_type": str(type(compat_model)),
-            "traction_model_type": str(type(traction_model)),
-            "industry_model_type": str(type(industry_model)),
-            "compat_expected_features": COMPAT_EXPECTED_FEATURES,
-            "traction_expected_features": TRACTION_EXPECTED_FEATURES,
-            "compat_has_predict_proba": hasattr(compat_model, 'predict_proba'),
-            "traction_has_predict_proba": hasattr(traction_model, 'predict_proba'),
+            "model_version": models.version,
+            "feature_version": models.feature_version,
+            "model_load_seconds": registry.load_seconds,
+            "model_reloads": registry.reloads,
+            "model_state": registry.state,
+            "compatibility_model_type": str(type(models.compat_model)),
+            "traction_model_type": str(type(models.traction_model)),
+            "industry_model_type": str(type(models.industry_model)),
+            "compat_expected_features": models.compat_features,
+            "traction_expected_features": models.traction_features,
+            "compat_has_predict_proba": hasattr(models.compat_model, 'predict_proba'),
+            "compat_compiled": models.compat_engine is not None,
+            "compat_surrogate": models.compat_surrogate is not None,
+            "suggestion_engine": models.suggestion_engine is not None,
+            "traction_has_predict_proba": hasattr(models.traction_model, 'predict_proba'),
             "investor_features": INVESTOR_FEATURES,
-            "startup_compat_features": STARTUP_COMPAT_FEATURES,
-            "startup_traction_features": STARTUP_TRACTION_FEATURES
+            "startup_compat_features": models.startup_compat_features,
+            "startup_traction_features": models.startup_traction_features,
+            "feature_cache": {
+                "investor": investor_cache.stats(),
+                "startup": startup_cache.stats()
+            },
+            "schedulers": {
+                "compatibility": compat_scheduler.stats(),
+                "traction": traction_scheduler.stats(),
+                "history": history_scheduler.stats()
+            },
+            "coalescing": {
+                "compatibility": compat_flight.stats(),
+                "traction": traction_flight.stats()
+            }
         }
         return info
     except Exception as e:
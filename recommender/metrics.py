@@ -0,0 +1,210 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain Python objects updated under a lock
+(a dict lookup and a few additions per observation), so they stay on in
+production. Gauges read their value from a callback at scrape time, so
+things like cache hit ratios cost nothing on the request path.
+"""
+
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds: sub-millisecond cache hits up to slow batch calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """Base class: a named metric family with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        return self.header() + list(self.samples())
+
+
+class Counter(Metric):
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            yield f'{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}'
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(labelvalues, list(counts), total) for labelvalues, (counts, total) in self._values.items()]
+        for labelvalues, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Gauge(Metric):
+    """Point-in-time values read from `callback` when the metrics are scraped.
+
+    The callback returns a {label values tuple: value} dict.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        if self.callback is None:
+            return
+        for labelvalues, value in self.callback().items():
+            yield f'{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.register(Counter(
+    'recommender_requests_total', 'Requests handled, by endpoint and outcome', ('endpoint', 'status')))
+REQUEST_ERRORS = registry.register(Counter(
+    'recommender_request_errors_total', 'Requests that failed with an unexpected exception', ('endpoint',)))
+REJECTIONS = registry.register(Counter(
+    'recommender_rejected_inputs_total',
+    'Inputs not scored: nan_input, invalid_score, invalid_sector, dimension_mismatch or short_history', ('endpoint', 'reason')))
+REQUEST_LATENCY = registry.register(Histogram(
+    'recommender_request_duration_seconds', 'End-to-end request latency', ('endpoint',)))
+STAGE_LATENCY = registry.register(Histogram(
+    'recommender_stage_duration_seconds',
+    'Latency of request stages (preprocess includes vectorize, the TF-IDF transform)', ('endpoint', 'stage')))
+
+
+def observe_request(endpoint, started, stages=None, status='ok'):
+    """Record one finished request; `started` is its time.perf_counter() start, stages are in ms"""
+    REQUESTS.inc(endpoint, status)
+    REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint)
+    if stages:
+        for stage, ms in stages.items():
+            STAGE_LATENCY.observe(ms / 1000, endpoint, stage)
+
+def observe_error(endpoint):
+    REQUESTS.inc(endpoint, 'error')
+    REQUEST_ERRORS.inc(endpoint)
+
+def observe_rejections(endpoint, reason, count=1):
+    if count:
+        REJECTIONS.inc(endpoint, reason, amount=count)
+
+def process_memory(pid=None):
+    """Memory of a process in bytes from /proc/<pid>/smaps_rollup (Linux only, else {}).
+
+    `pss` charges shared pages proportionally to each process mapping them,
+    so summing it over forked workers gives their real combined footprint;
+    `private` is what the process does not share with anyone.
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    try:
+        with open(path) as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return {}
+    kb = {name: int(value.split()[0]) for name, value in fields.items() if value.strip().endswith('kB')}
+    return {
+        "rss": kb.get('Rss', 0) * 1024,
+        "pss": kb.get('Pss', 0) * 1024,
+        "shared": (kb.get('Shared_Clean', 0) + kb.get('Shared_Dirty', 0)) * 1024,
+        "private": (kb.get('Private_Clean', 0) + kb.get('Private_Dirty', 0)) * 1024
+    }
+
+def register_gauge(name, documentation, labelnames, callback):
+    """Add a scrape-time gauge backed by `callback`"""
+    return registry.register(Gauge(name, documentation, labelnames, callback))
+
+
+register_gauge(
+    'recommender_process_memory_bytes', 'Memory of the process serving the scrape, by kind (rss, pss, shared, private)',
+    ('kind',), lambda: {(kind,): value for kind, value in process_memory().items()}
+)
@@ -0,0 +1,377 @@
+"""
+Model registry for the recommender service.
+
+Artifacts are loaded off the request path in a background thread and
+published as one immutable ModelSet once they are loaded and warmed up.
+Handlers take a reference to the current ModelSet and use it for the
+whole request, so a reload swaps in a new set without disturbing
+requests that are still running on the old one.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from functools import cached_property
+
+import joblib
+import scipy.sparse as sp
+
+from explain import TreeShapExplainer, compat_feature_layout, traction_feature_layout
+from features import INVESTOR_FEATURES, TEXT_FEATURES, build_term_map, sector_similarity_matrix
+from history_buffer import INTERACTION_FEATURES
+from tree_engine import CompiledTreeEnsemble
+
+logger = logging.getLogger(__name__)
+
+# Attribute name on ModelSet -> artifact file written by train_model.py
+ARTIFACTS = {
+    'compat_model': 'compatibility_model.joblib',
+    'traction_model': 'traction_model.joblib',
+    'industry_model': 'industry_model.joblib',
+    'thesis_vectorizer': 'thesis_vectorizer.joblib',
+    'description_vectorizer': 'description_vectorizer.joblib'
+}
+
+# Artifacts that are loaded when present and None otherwise
+OPTIONAL_ARTIFACTS = {
+    'compat_surrogate': 'compat_surrogate.joblib',
+    'history_model': 'history_model.joblib',
+    'suggestion_engine': 'suggestion_engine.joblib'
+}
+
+# Vectorizer artifacts: feature vectors (and cached ones) only change with these
+FEATURE_ARTIFACTS = ('thesis_vectorizer', 'description_vectorizer')
+
+# Larger batches go to the model's own predict_proba. The compiled
+# evaluator wins on small batches only: with 100 depth-3 trees
+# (benchmark_tree_engine.py) it breaks even with predict_proba at about
+# 128 rows and is about half as fast from 384 rows up
+COMPILED_MAX_BATCH = 128
+
+
+def load_artifact(path):
+    """Load a joblib artifact with its numpy arrays memory-mapped read-only.
+
+    Only arrays kept as plain attributes stay mapped: the TF-IDF `idf_`
+    vectors, the surrogate's matrices and the suggestion engine's PCA and
+    k-means arrays. The big models are copied onto the heap anyway:
+    sklearn trees copy their node arrays in `__setstate__`, and XGBoost
+    and Keras models are rebuilt from serialized bytes. Workers share those
+    only when they are forked after the load (see start_recommender.py).
+    Artifacts that cannot be mapped (e.g. compressed dumps) fall back to a
+    regular load.
+    """
+    try:
+        return joblib.load(path, mmap_mode='r')
+    except Exception as e:
+        logger.warning(f"Memory-mapped load failed for {path} ({e}), loading into memory")
+        return joblib.load(path)
+
+def compile_ensemble(model):
+    """Compiled evaluator for a tree ensemble, or None if the model is not supported"""
+    try:
+        return CompiledTreeEnsemble(model)
+    except Exception as e:
+        logger.info(f"Tree ensemble not compiled ({e}), using the model's predict_proba")
+        return None
+
+def artifact_paths(model_dir):
+    """Attribute name -> path for the required and the present optional artifacts"""
+    paths = {name: os.path.join(model_dir, filename) for name, filename in ARTIFACTS.items()}
+    for name, filename in OPTIONAL_ARTIFACTS.items():
+        path = os.path.join(model_dir, filename)
+        if os.path.exists(path):
+            paths[name] = path
+    return paths
+
+def artifact_version(paths):
+    """Short content version derived from artifact names, sizes and mtimes"""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+class ModelSet:
+    """One consistent set of models, vectorizers and the feature sizes they imply"""
+
+    def __init__(self, artifacts, version, feature_version=None):
+        for name in ARTIFACTS:
+            setattr(self, name, artifacts[name])
+        for name in OPTIONAL_ARTIFACTS:
+            setattr(self, name, artifacts.get(name))
+        self.version = version
+        self.loaded_at = time.time()
+        # Derived state built by the registry's on_load hook (e.g. the startup catalog)
+        self.catalog = None
+        self.investor_store = None
+        self.startup_store = None
+        self.history_buffer = None
+        # Artifacts left out of load(), for load_deferred() to read later
+        self.deferred_paths = {}
+
+        # Get actual expected feature dimensions from the models
+        self.compat_features = int(self.compat_model.n_features_in_)
+        self.traction_features = int(self.traction_model.n_features_in_)
+        self.investor_features = INVESTOR_FEATURES
+        self.startup_compat_features = self.compat_features - INVESTOR_FEATURES
+        self.startup_traction_features = self.traction_features
+        if self.startup_compat_features <= 0:
+            raise ValueError(
+                f"Compatibility model expects {self.compat_features} features, "
+                f"fewer than the {INVESTOR_FEATURES} investor features"
+            )
+
+        self.validate()
+        # Feature caches are keyed by this, so they stay warm across a
+        # reload that keeps the vectorizers and feature widths
+        self.feature_version = f"{feature_version or version}:{self.compat_features}:{self.traction_features}"
+
+        self.thesis_term_cols, self.description_term_cols = build_term_map(
+            self.thesis_vectorizer, self.description_vectorizer
+        )
+        self.compat_engine = compile_ensemble(self.compat_model)
+        self.sector_matrix = sector_similarity_matrix(self.industry_model)
+        self.sector_matrix.flags.writeable = False
+
+    def validate(self):
+        """Check the models against the feature layout built by features.py"""
+        if self.traction_features <= 0:
+            raise ValueError(f"Traction model expects {self.traction_features} features")
+        for name in FEATURE_ARTIFACTS:
+            width = len(getattr(self, name).get_feature_names_out())
+            if width > TEXT_FEATURES:
+                raise ValueError(f"{name} has {width} terms, more than the {TEXT_FEATURES} text feature columns")
+        surrogate = self.compat_surrogate
+        if surrogate is not None and (surrogate.n_features_in_ != self.compat_features
+                                      or surrogate.investor_width != INVESTOR_FEATURES):
+            # The surrogate is only a ranking shortcut, so a stale one is dropped rather than failing the load
+            logger.warning(
+                f"Ignoring compat_surrogate: fitted on {surrogate.n_features_in_} features split at "
+                f"{surrogate.investor_width}, expected {self.compat_features} split at {INVESTOR_FEATURES}"
+            )
+            self.compat_surrogate = None
+        engine = self.suggestion_engine
+        if engine is not None and (engine.n_investor_features_ != INVESTOR_FEATURES
+                                   or engine.n_startup_features_ != self.startup_compat_features):
+            logger.warning(
+                f"Ignoring suggestion_engine: trained on {engine.n_investor_features_} investor and "
+                f"{engine.n_startup_features_} startup features, expected {INVESTOR_FEATURES} and {self.startup_compat_features}"
+            )
+            self.suggestion_engine = None
+        self.history_seq_length = None
+        if self.history_model is not None:
+            _, seq_length, width = self.history_model.input_shape
+            if width != INTERACTION_FEATURES:
+                logger.warning(f"Ignoring history_model: expects {width} features per interaction, not {INTERACTION_FEATURES}")
+                self.history_model = None
+            else:
+                self.history_seq_length = int(seq_length)
+
+    def compat_proba(self, X):
+        """Positive-class compatibility probability for each row of X (dense or CSR)"""
+        if sp.issparse(X):
+            return self.compat_model.predict_proba(X)[:, 1]
+        if self.compat_engine is not None and X.shape[0] <= COMPILED_MAX_BATCH:
+            return self.compat_engine.predict_proba(X)[:, 1]
+        return self.compat_model.predict_proba(X)[:, 1]
+
+    @cached_property
+    def compat_explainer(self):
+        """TreeSHAP explainer for the compatibility model, or None if the model is not supported"""
+        try:
+            return TreeShapExplainer(self.compat_model)
+        except Exception as e:
+            logger.info(f"Compatibility model cannot be explained ({e})")
+            return None
+
+    @cached_property
+    def compat_layout(self):
+        """(feature names, block labels) of the compatibility model's columns"""
+        return compat_feature_layout(self)
+
+    @cached_property
+    def traction_layout(self):
+        return traction_feature_layout(self)
+
+    @classmethod
+    def load(cls, model_dir, deferred=()):
+        """Load the artifacts in model_dir, except the optional ones named in `deferred`"""
+        paths = artifact_paths(model_dir)
+        version = artifact_version(paths.values())
+        feature_version = artifact_version([paths[name] for name in FEATURE_ARTIFACTS])
+        artifacts = {name: load_artifact(path) for name, path in paths.items() if name not in deferred}
+        models = cls(artifacts, version, feature_version)
+        models.deferred_paths = {name: path for name, path in paths.items() if name in deferred}
+        return models
+
+    def load_deferred(self):
+        """Load and validate the artifacts load() deferred; returns their names"""
+        names = list(self.deferred_paths)
+        for name, path in self.deferred_paths.items():
+            setattr(self, name, load_artifact(path))
+        self.deferred_paths = {}
+        self.validate()
+        return names
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "feature_version": self.feature_version,
+            "loaded_at": self.loaded_at,
+            "compat_features": self.compat_features,
+            "traction_features": self.traction_features,
+            "investor_features": self.investor_features,
+            "startup_compat_features": self.startup_compat_features,
+            "startup_traction_features": self.startup_traction_features,
+            "compat_compiled": self.compat_engine is not None,
+            "compat_surrogate": self.compat_surrogate is not None,
+            "history_seq_length": self.history_seq_length,
+            "suggestion_engine": self.suggestion_engine is not None
+        }
+
+
+class ModelRegistry:
+    """Loads ModelSets in the background, tracks readiness and hot-swaps reloads.
+
+    `on_load` is called with a freshly loaded ModelSet before it is
+    published (warm-up inference, rebuilding derived state); an exception
+    there fails the load. A failed reload leaves the current set active.
+    Optional artifacts named in `deferred` are left for
+    ModelSet.load_deferred().
+    """
+
+    def __init__(self, model_dir='.', on_load=None):
+        self.model_dir = model_dir
+        self.on_load = on_load
+        self.deferred = ()
+        self.state = 'idle'
+        self.error = None
+        self.load_seconds = None
+        self.reloads = 0
+        self.failed_version = None
+        self._models = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._thread = None
+        self._watcher = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def get(self):
+        """Current ModelSet, or None while the first load is still running"""
+        return self._models
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def disk_version(self):
+        """Version of the artifacts currently on disk"""
+        return artifact_version(artifact_paths(self.model_dir).values())
+
+    def load(self):
+        """Load, warm up and publish a ModelSet synchronously"""
+        with self._load_lock:
+            current = self._models
+            self.state = 'reloading' if current is not None else 'loading'
+            started = time.perf_counter()
+            try:
+                models = ModelSet.load(self.model_dir, self.deferred)
+                if self.on_load is not None:
+                    self.on_load(models)
+            except Exception as e:
+                self.error = str(e)
+                if current is not None:
+                    self.state = 'ready'
+                    logger.error(f"Model reload failed, keeping version {current.version}: {str(e)}")
+                else:
+                    self.state = 'failed'
+                    logger.error(f"Failed to load models or vectorizers: {str(e)}")
+                raise
+
+            # Publishing is a single reference assignment: requests that
+            # already hold the old set finish on it
+            self._models = models
+            self.load_seconds = time.perf_counter() - started
+            self.state = 'ready'
+            self.error = None
+            self.failed_version = None
+            if current is not None:
+                self.reloads += 1
+            self._ready.set()
+            logger.info(f"Models and vectorizers loaded successfully (version {models.version}) in {self.load_seconds:.2f}s")
+            return models
+
+    def start_background_load(self):
+        """Start loading in a daemon thread unless models are loaded or loading"""
+        with self._lock:
+            if self._models is not None or (self._thread is not None and self._thread.is_alive()):
+                return
+            self.state = 'loading'
+            self._start_loader()
+
+    def start_background_reload(self):
+        """Load the artifacts on disk again in a daemon thread and swap them in; False if a load is running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._start_loader()
+            return True
+
+    def _start_loader(self):
+        self._thread = threading.Thread(target=self._load_in_background, name='model-loader', daemon=True)
+        self._thread.start()
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception:
+            pass  # already logged and recorded in self.error
+
+    def start_watcher(self, interval):
+        """Poll the artifact files every `interval` seconds and reload when they change.
+
+        A new version is only loaded once it reads the same on two polls in
+        a row, so files that are still being copied are not picked up, and
+        a version that failed to load is not retried.
+        """
+        with self._lock:
+            if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), name='model-watcher', daemon=True)
+            self._watcher.start()
+
+    def _watch(self, interval):
+        seen = None
+        while True:
+            time.sleep(interval)
+            try:
+                version = self.disk_version()
+            except OSError:
+                seen = None  # artifacts missing or being replaced
+                continue
+            current = self._models
+            stable, seen = version == seen, version
+            if not stable or current is None or version in (current.version, self.failed_version):
+                continue
+            logger.info(f"Model artifacts changed on disk ({current.version} -> {version}), reloading")
+            try:
+                self.load()
+            except Exception:
+                self.failed_version = version
+
+    def status(self):
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "version": self._models.version if self._models is not None else None,
+            "load_seconds": self.load_seconds,
+            "reloads": self.reloads,
+            "error": self.error
+        }
@@ -1,5 +1,9 @@
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.metrics import roc_auc_score, precision_recall_curve
+from sklearn.neighbors import NearestNeighbors
 
 class CompatibilityModel:
     def __init__(self):
@@ -15,4 +19,70 @@ class CompatibilityModel:
         y_pred = self.predict(X_test)
         auc = roc_auc_score(y_test, y_pred)
         print(f"Model AUC: {auc:.3f}")
-        return auc
\ No newline at end of file
+        return auc
+
+
+def top_n_indices(scores, n):
+    """Indices of the n highest scores, highest first, without sorting the rest"""
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-scores, n - 1)[:n]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+class SuggestionEngine:
+    # Weights of the distance to the startup's cluster centroid and of the distance from the investor
+    CLUSTER_WEIGHT = 0.6
+    INVESTOR_WEIGHT = 0.4
+
+    def __init__(self):
+        self.investor_pca = PCA(n_components=8)
+        self.startup_pca = PCA(n_components=8)
+        self.startup_cluster = KMeans(n_clusters=10, random_state=42, n_init=10) # Added n_init for KMeans
+        self.startup_nn = NearestNeighbors(n_neighbors=5)
+        self.startup_reduced = None
+        self.startup_cluster_dists = None
+        self.startup_ids = None
+
+    def train(self, investor_features, startup_features, startup_ids=None):
+        # Train PCA separately for investor and startup features
+        self.investor_pca.fit(investor_features)
+        self.startup_pca.fit(startup_features)
+        startup_reduced = self.startup_pca.transform(startup_features)
+
+        # Cluster and fit nearest neighbors on startup features in PCA space
+        self.startup_cluster.fit(startup_reduced)
+        self.startup_nn.fit(startup_reduced)
+
+        self.n_investor_features_ = np.shape(investor_features)[1]
+        self.n_startup_features_ = np.shape(startup_features)[1]
+
+        # Cache the training catalog's projections and centroid distances
+        self.startup_reduced, self.startup_cluster_dists = self.project_startups(startup_features)
+        self.startup_ids = None if startup_ids is None else np.asarray(startup_ids)
+
+    def project_startups(self, startup_vecs):
+        """(PCA projections, distance to the nearest cluster centroid) for a batch of startups"""
+        startup_reduced = self.startup_pca.transform(np.atleast_2d(startup_vecs))
+        labels = self.startup_cluster.predict(startup_reduced)
+        cluster_dists = np.linalg.norm(startup_reduced - self.startup_cluster.cluster_centers_[labels], axis=1)
+        return startup_reduced.astype(np.float32), cluster_dists.astype(np.float32)
+
+    def novelty_scores(self, investor_vec, startup_reduced, cluster_dists):
+        """Novelty of projected startups for one investor (higher is more novel)"""
+        investor_reduced = self.investor_pca.transform(np.asarray(investor_vec).reshape(1, -1))
+        investor_dist = np.linalg.norm(startup_reduced - investor_reduced, axis=1)
+        return self.CLUSTER_WEIGHT * cluster_dists + self.INVESTOR_WEIGHT * investor_dist
+
+    def get_novel_suggestions(self, investor_vec, startup_vecs=None, startup_ids=None, n=5):
+        # Without startup vectors, the catalog cached at training time is used
+        if startup_vecs is None:
+            startup_reduced, cluster_dists = self.startup_reduced, self.startup_cluster_dists
+            startup_ids = self.startup_ids if startup_ids is None else startup_ids
+        else:
+            startup_reduced, cluster_dists = self.project_startups(startup_vecs)
+        novelty_scores = self.novelty_scores(investor_vec, startup_reduced, cluster_dists)
+
+        # Return the IDs of the top novel startups and their scores
+        novel_indices = top_n_indices(novelty_scores, n)
+        return [startup_ids[i] for i in novel_indices], novelty_scores[novel_indices]
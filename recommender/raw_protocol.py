@@ -0,0 +1,39 @@
+"""
+Binary float32 protocol for internal high-volume callers.
+
+A request body is an 8-byte header, rows and cols as little-endian
+uint32, followed by rows * cols little-endian float32 values in row-major
+order. The response body is rows little-endian float32 scores. Decoding
+is a zero-copy np.frombuffer view over the request bytes.
+"""
+
+import struct
+
+import numpy as np
+
+CONTENT_TYPE = 'application/octet-stream'
+HEADER = struct.Struct('<II')
+FLOAT32 = np.dtype('<f4')
+
+
+def decode_matrix(body):
+    """Read-only (rows, cols) float32 view of a request body"""
+    if len(body) < HEADER.size:
+        raise ValueError(f"Body is {len(body)} bytes, shorter than the {HEADER.size}-byte shape header")
+    rows, cols = HEADER.unpack_from(body)
+    expected = HEADER.size + rows * cols * FLOAT32.itemsize
+    if len(body) != expected:
+        raise ValueError(f"Header says {rows}x{cols} float32 ({expected} bytes with header), body is {len(body)} bytes")
+    return np.frombuffer(body, dtype=FLOAT32, count=rows * cols, offset=HEADER.size).reshape(rows, cols)
+
+def encode_matrix(matrix):
+    """Request body for a 2-D feature matrix (client side)"""
+    matrix = np.ascontiguousarray(np.atleast_2d(matrix), dtype=FLOAT32)
+    return HEADER.pack(*matrix.shape) + matrix.tobytes()
+
+def encode_scores(scores):
+    return np.ascontiguousarray(scores, dtype=FLOAT32).tobytes()
+
+def decode_scores(body):
+    """Scores from a response body (client side)"""
+    return np.frombuffer(body, dtype=FLOAT32)
@@ -0,0 +1,137 @@
+"""
+Low-overhead logging for the recommender hot path.
+
+Records go onto an in-memory queue via a QueueHandler; a background
+QueueListener thread formats them and writes app.log and the console, so
+request threads never wait on disk I/O or string formatting. Each request
+emits one structured JSON record with per-stage timings, and verbose
+input details are only attached to a sampled fraction of requests.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from logging.handlers import QueueHandler, QueueListener
+
+from metrics import observe_request
+
+LOG_FILE = os.environ.get('RECOMMENDER_LOG_FILE', 'app.log')
+LOG_LEVEL = os.environ.get('RECOMMENDER_LOG_LEVEL', 'INFO').upper()
+DEBUG_SAMPLE_RATE = float(os.environ.get('RECOMMENDER_DEBUG_SAMPLE_RATE', 0.01))
+
+request_logger = logging.getLogger('recommender.requests')
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_pid = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats request records as one JSON line and everything else as plain text"""
+
+    def format(self, record):
+        payload = getattr(record, 'request_log', None)
+        if payload is None:
+            return super().format(record)
+        return json.dumps({"time": self.formatTime(record), "level": record.levelname, **payload}, default=str)
+
+
+def setup_logging():
+    """Route all logging through the queue and start the background listener"""
+    formatter = StructuredFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(_log_queue)]
+    root.setLevel(LOG_LEVEL)
+    start_listener(formatter)
+
+def start_listener(formatter=None):
+    """Start the listener thread in this process (again after a fork, where threads are lost)"""
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    if formatter is None:
+        formatter = _listener.handlers[0].formatter if _listener is not None else StructuredFormatter()
+    file_handler = logging.FileHandler(LOG_FILE)
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    _listener = QueueListener(_log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+    atexit.register(_listener.stop)
+
+def stop_listener():
+    """Flush queued records and stop the listener thread (e.g. before forking workers)"""
+    global _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        atexit.unregister(_listener.stop)
+        for handler in _listener.handlers:
+            handler.close()
+    _listener_pid = None
+
+
+class StageTimer:
+    """Wall time per named stage, in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+class _NullTimer:
+    """Stand-in when the caller does not collect timings"""
+
+    def stage(self, name):
+        return nullcontext()
+
+
+NULL_TIMER = _NullTimer()
+
+
+def should_sample():
+    """True for the fraction of requests that get verbose debug details"""
+    return DEBUG_SAMPLE_RATE > 0 and random.random() < DEBUG_SAMPLE_RATE
+
+def log_request(endpoint, started, stages=None, level=logging.INFO, **fields):
+    """Emit the single structured record for a request.
+
+    `started` is the request's time.perf_counter() start, `stages` the
+    per-stage timings in ms. Extra keyword fields go into the record as-is
+    (None values are dropped), so pass only cheap values; formatting
+    happens on the listener thread. The request is also recorded in the
+    /metrics latency histograms, whatever the log level.
+    """
+    observe_request(endpoint, started, stages, fields.get('status') or 'ok')
+    if not request_logger.isEnabledFor(level):
+        return
+    payload = {
+        "endpoint": endpoint,
+        "total_ms": round((time.perf_counter() - started) * 1000, 3),
+        "stages": stages or {},
+        **{key: value for key, value in fields.items() if value is not None}
+    }
+    request_logger.log(level, endpoint, extra={"request_log": payload})
@@ -0,0 +1,92 @@
+"""
+Request models for the recommender API.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# Define input models
+class InvestorInput(BaseModel):
+    type: str
+    location: str
+    avg_check_size: float
+    min_roi: float
+    risk_appetite: float
+    years_active: float
+    total_investments: float
+    preferred_sectors: List[str]
+    preferred_stages: List[str]
+    thesis: str
+
+class StartupInput(BaseModel):
+    sector: str
+    stage: str
+    location: str
+    founding_date: str
+    employees: int
+    mrr: float
+    growth_rate: float
+    burn_rate: float
+    funding_to_date: float
+    description: str
+    last_valuation: float
+
+class CatalogStartupInput(StartupInput):
+    id: str
+
+class RegisteredInvestorInput(InvestorInput):
+    id: str
+
+class CompatibilityByIdRequest(BaseModel):
+    investor_id: str
+    startup_ids: List[str]
+
+class TractionByIdRequest(BaseModel):
+    startup_ids: List[str]
+
+class InteractionInput(BaseModel):
+    investor_id: str
+    startup_id: Optional[str] = None
+    startup: Optional[StartupInput] = None
+    interacted: int
+
+class NextInteractionRequest(BaseModel):
+    investor_ids: List[str]
+
+class SectorPair(BaseModel):
+    sector1: str
+    sector2: str
+
+
+def sample_investor():
+    """Fixed investor used by the feature test endpoint and model warm-up"""
+    return InvestorInput(
+        type="VC",
+        location="Test",
+        avg_check_size=1000000,
+        min_roi=3.0,
+        risk_appetite=5.0,
+        years_active=5.0,
+        total_investments=10000000,
+        preferred_sectors=["Tech"],
+        preferred_stages=["Seed"],
+        thesis="Test thesis for testing feature generation."
+    )
+
+def sample_startup():
+    """Fixed startup used by the feature test endpoint and model warm-up"""
+    return StartupInput(
+        sector="Tech",
+        stage="Seed",
+        location="Test",
+        founding_date="2023-01-01",
+        employees=10,
+        mrr=50000,
+        growth_rate=0.15,
+        burn_rate=0.1,
+        funding_to_date=500000,
+        description="Test startup description for testing feature generation.",
+        last_valuation=2000000
+    )
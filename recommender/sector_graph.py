@@ -0,0 +1,51 @@
+"""
+Sector co-occurrence graph for the industry compatibility model.
+
+Two sectors are linked with a weight equal to the number of investors
+that list both among their preferred sectors. The weights come from one
+sparse product of the investor x sector incidence matrix with itself
+(B^T B), so the cost grows with the number of preference entries rather
+than with sectors^2 x investors.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def sector_incidence(preferred_sectors, sectors):
+    """Binary CSR (investors x sectors): 1 where an investor prefers a sector.
+
+    `preferred_sectors` is a sequence of lists, one per investor; sectors
+    not in `sectors` are ignored.
+    """
+    preferred = pd.Series(list(preferred_sectors), dtype=object).explode()
+    columns = pd.Index(sectors).get_indexer(preferred.values)
+    known = columns >= 0
+    incidence = sp.csr_matrix(
+        (np.ones(int(known.sum()), dtype=np.int64), (preferred.index.values[known], columns[known])),
+        shape=(len(preferred_sectors), len(sectors))
+    )
+    incidence.sum_duplicates()
+    incidence.data[:] = 1  # a sector listed twice by one investor still counts once
+    return incidence
+
+def sector_cooccurrence(preferred_sectors, sectors):
+    """Sparse (sectors x sectors) count of investors preferring both sectors, zero diagonal"""
+    incidence = sector_incidence(preferred_sectors, sectors)
+    cooccurrence = (incidence.T @ incidence).tocsr()
+    cooccurrence.setdiag(0)
+    cooccurrence.eliminate_zeros()
+    return cooccurrence
+
+def build_sector_graph(sectors, preferred_sectors):
+    """Weighted networkx graph with every sector as a node and co-occurrence edges"""
+    sectors = list(sectors)
+    cooccurrence = sp.triu(sector_cooccurrence(preferred_sectors, sectors), k=1).tocoo()
+    graph = nx.Graph()
+    graph.add_nodes_from(sectors)
+    graph.add_weighted_edges_from(
+        (sectors[i], sectors[j], int(weight)) for i, j, weight in zip(cooccurrence.row, cooccurrence.col, cooccurrence.data)
+    )
+    return graph
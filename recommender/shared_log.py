@@ -0,0 +1,109 @@
+"""
+Append-only NDJSON log followed by several processes.
+
+Writers append whole lines while holding an exclusive flock on
+`<path>.lock`. Every process remembers how far into the file it has read
+and picks up the lines appended since with read_new(), so processes
+forked from one parent (or started separately) converge on the same
+entries in the same order. rewrite() swaps in a new file, e.g. a
+compacted one; followers notice the new inode and read it from the start.
+"""
+
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class SharedLog:
+    def __init__(self, path):
+        self.path = path
+        self._lock_path = f"{path}.lock"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._inode = None
+        self._offset = 0
+
+    @property
+    def inode(self):
+        return self._inode
+
+    @property
+    def offset(self):
+        """Bytes of the current file read by this process"""
+        return self._offset
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock across processes.
+
+        The lock file is opened on every call: flock locks belong to the
+        open file description, which a forked child would otherwise share.
+        """
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def changed(self):
+        """Whether the file has lines, or is a new file, this process has not read yet"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._inode or stat.st_size != self._offset
+
+    def read_new(self, end=None):
+        """(entries appended since the last call, whether the file was replaced and read from the start).
+
+        Reads complete lines only, up to byte `end` if given. Call under locked().
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], False
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            restarted = inode != self._inode
+            if restarted:
+                self._inode, self._offset = inode, 0
+            f.seek(self._offset)
+            data = f.read() if end is None else f.read(max(end - self._offset, 0))
+        data = data[:data.rfind(b'\n') + 1]
+        self._offset += len(data)
+        entries = []
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"{os.path.basename(self.path)}: skipping unreadable log line")
+        return entries, restarted
+
+    def append(self, entries):
+        """Append entries; call under locked(), after read_new() has reached the end"""
+        data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode()
+        with open(self.path, 'ab') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._inode:
+                self._inode, self._offset = inode, 0
+            if f.tell() != self._offset:
+                # A writer died halfway through a line: end it so ours stay readable
+                data = b'\n' + data
+                self._offset = f.tell()
+            f.write(data)
+        self._offset += len(data)
+
+    def rewrite(self, entries):
+        """Replace the file with `entries` (under locked()); other processes re-read it"""
+        data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._inode, self._offset = os.stat(self.path).st_ino, len(data)
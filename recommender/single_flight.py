@@ -0,0 +1,50 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight computation: the
+first caller starts it and later callers await the same result (or
+exception) instead of repeating the work. Nothing is cached once the
+computation finishes.
+"""
+
+import asyncio
+
+import metrics
+
+COALESCED = metrics.registry.register(metrics.Counter(
+    'recommender_coalesced_requests_total', 'Requests served by joining an identical in-flight request', ('endpoint',)))
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent coroutines on one event loop"""
+
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key, fn):
+        """Result of `fn()` (a coroutine function), shared with concurrent callers of the same key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            COALESCED.inc(self.name)
+        # A caller that goes away does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
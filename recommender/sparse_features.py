@@ -0,0 +1,134 @@
+"""
+Sparse (CSR) feature assembly with the same column layout as features.py.
+
+TF-IDF output stays sparse, the one-hot blocks become single column
+indices and padding up to the model widths is just a wider shape, so a
+row stores only its non-zero entries instead of ~320 dense floats.
+
+The sklearn compatibility model accepts CSR input directly (the compiled
+tree evaluator stays dense). XGBoost reads entries absent from a sparse
+matrix as missing values rather than zeros, so traction rows must be
+densified with .toarray() before they reach the traction model.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+from features import INVESTOR_FEATURES, INVESTOR_TYPES, SECTOR_INDEX, SECTORS, STAGE_INDEX, STAGES, TEXT_FEATURES
+
+# Column offsets of each block, matching vectorize_investor / vectorize_startups
+INVESTOR_TYPE_OFFSET = 5
+INVESTOR_SECTOR_OFFSET = INVESTOR_TYPE_OFFSET + len(INVESTOR_TYPES)
+INVESTOR_STAGE_OFFSET = INVESTOR_SECTOR_OFFSET + len(SECTORS)
+INVESTOR_THESIS_OFFSET = INVESTOR_STAGE_OFFSET + len(STAGES)
+STARTUP_SECTOR_OFFSET = 6
+STARTUP_STAGE_OFFSET = STARTUP_SECTOR_OFFSET + len(SECTORS)
+STARTUP_DESCRIPTION_OFFSET = STARTUP_STAGE_OFFSET + len(STAGES)
+
+
+def _dense_block(values, offset):
+    rows, cols = np.nonzero(values)  # NaN counts as non-zero, so it is kept
+    return rows, cols + offset, values[rows, cols]
+
+def _one_hot_block(pairs, offset):
+    """Entries equal to 1 at (row, column index) pairs"""
+    pairs = np.array(sorted(set(pairs)), dtype=np.intp).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1] + offset, np.ones(len(pairs), dtype=np.float32)
+
+def _text_block(tfidf, offset):
+    tfidf = tfidf.tocoo()
+    keep = tfidf.col < TEXT_FEATURES
+    return tfidf.row[keep], tfidf.col[keep] + offset, tfidf.data[keep]
+
+def _assemble(blocks, n_rows, width):
+    """CSR matrix from (rows, cols, values) blocks, dropping columns past `width`"""
+    rows = np.concatenate([block[0] for block in blocks]).astype(np.intp)
+    cols = np.concatenate([block[1] for block in blocks]).astype(np.intp)
+    values = np.concatenate([block[2] for block in blocks]).astype(np.float32)
+    keep = cols < width
+    return sp.csr_matrix((values[keep], (rows[keep], cols[keep])), shape=(n_rows, width), dtype=np.float32)
+
+def sparse_investor_rows(investors, models):
+    """CSR counterpart of vectorize_investor for a list of investors, shape (n, INVESTOR_FEATURES)"""
+    n = len(investors)
+    numeric = np.array([
+        [
+            investor_data.avg_check_size,
+            investor_data.min_roi,
+            investor_data.risk_appetite,
+            investor_data.years_active,
+            investor_data.total_investments
+        ]
+        for investor_data in investors
+    ], dtype=np.float32).reshape(n, 5)
+    thesis = models.thesis_vectorizer.transform([investor_data.thesis for investor_data in investors])
+
+    return _assemble([
+        _dense_block(numeric, 0),
+        _one_hot_block([
+            (row, INVESTOR_TYPES[investor_data.type.upper()])
+            for row, investor_data in enumerate(investors) if investor_data.type.upper() in INVESTOR_TYPES
+        ], INVESTOR_TYPE_OFFSET),
+        _one_hot_block([
+            (row, SECTOR_INDEX[sector])
+            for row, investor_data in enumerate(investors) for sector in investor_data.preferred_sectors
+            if sector in SECTOR_INDEX
+        ], INVESTOR_SECTOR_OFFSET),
+        _one_hot_block([
+            (row, STAGE_INDEX[stage])
+            for row, investor_data in enumerate(investors) for stage in investor_data.preferred_stages
+            if stage in STAGE_INDEX
+        ], INVESTOR_STAGE_OFFSET),
+        _text_block(thesis, INVESTOR_THESIS_OFFSET)
+    ], n, INVESTOR_FEATURES)
+
+def sparse_startup_rows(startups, models):
+    """CSR counterpart of vectorize_startups: (compat rows, traction rows)"""
+    n = len(startups)
+    numeric = np.array([
+        [
+            startup_data.employees,
+            startup_data.mrr,
+            startup_data.growth_rate,
+            startup_data.burn_rate,
+            startup_data.funding_to_date,
+            startup_data.last_valuation
+        ]
+        for startup_data in startups
+    ], dtype=np.float32).reshape(n, 6)
+    description = models.description_vectorizer.transform([startup_data.description for startup_data in startups])
+
+    blocks = [
+        _dense_block(numeric, 0),
+        _one_hot_block([
+            (row, SECTOR_INDEX[startup_data.sector])
+            for row, startup_data in enumerate(startups) if startup_data.sector in SECTOR_INDEX
+        ], STARTUP_SECTOR_OFFSET),
+        _one_hot_block([
+            (row, STAGE_INDEX[startup_data.stage])
+            for row, startup_data in enumerate(startups) if startup_data.stage in STAGE_INDEX
+        ], STARTUP_STAGE_OFFSET),
+        _text_block(description, STARTUP_DESCRIPTION_OFFSET)
+    ]
+    return (
+        _assemble(blocks, n, models.startup_compat_features),
+        _assemble(blocks, n, models.startup_traction_features)
+    )
+
+def sparse_compat_matrix(investor_rows, startup_rows):
+    """Compatibility model input; a single investor row is broadcast over every startup"""
+    if investor_rows.shape[0] == 1 and startup_rows.shape[0] != 1:
+        investor_rows = investor_rows[np.zeros(startup_rows.shape[0], dtype=np.intp)]
+    return sp.hstack([investor_rows, startup_rows], format='csr', dtype=np.float32)
+
+def sparse_invalid_rows(matrix):
+    """Boolean mask of CSR rows holding a NaN"""
+    invalid = np.zeros(matrix.shape[0], dtype=bool)
+    nan_entries = np.isnan(matrix.data)
+    if nan_entries.any():
+        row_of_entry = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        invalid[row_of_entry[nan_entries]] = True
+    return invalid
+
+def csr_nbytes(matrix):
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
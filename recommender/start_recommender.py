@@ -2,10 +2,20 @@
 """
 Startup script for the AI Recommender FastAPI server
 Optimized for unified project management
+
+Development (default): one uvicorn process with auto-reload.
+Production (--workers N or RECOMMENDER_WORKERS=N): the models are loaded
+and warmed up once in this process, then N workers are forked to serve a
+shared listening socket. The workers inherit the model and vectorizer
+arrays copy-on-write, so they share one copy instead of loading their own.
 """
 
 import uvicorn
+import argparse
+import gc
 import os
+import signal
+import socket
 import sys
 import logging
 
@@ -16,21 +26,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def bind_socket(host, port, backlog=2048):
+    """Listening socket created before the fork and shared by every worker"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock):
+    """Serve requests in a forked worker until it is told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # log_config=None keeps the service's queue-based logging
+    config = uvicorn.Config(app, log_config=None, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+def serve_prefork(host, port, workers):
+    """Load the models once, then fork `workers` uvicorn workers on one socket"""
+    from main import FORK_UNSAFE_ARTIFACTS, app, load_deferred_models, registry
+    from metrics import process_memory
+    from request_logging import start_listener, stop_listener
+
+    # Load, warm up and build the catalog before forking so that every
+    # worker starts ready and inherits the same pages. TensorFlow models are
+    # loaded by each worker after the fork instead
+    registry.deferred = FORK_UNSAFE_ARTIFACTS
+    registry.load()
+    memory = process_memory()
+    if memory:
+        logger.info(f"Models loaded in the parent: RSS {memory['rss'] / 2**20:.1f} MiB")
+
+    # Objects that exist now are never collected again, so the garbage
+    # collector does not write to (and un-share) their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(host, port)
+    children = {}
+    stopping = False
+
+    def spawn(index):
+        stop_listener()  # no logging thread may be running across fork()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                load_deferred_models()
+                run_worker(app, sock)
+                status = 0
+            except BaseException as e:
+                logger.error(f"Worker {index} failed: {e}")
+            finally:
+                stop_listener()
+                os._exit(status)
+        start_listener()
+        children[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for index in range(workers):
+        spawn(index)
+
+    # Supervise: restart workers that die until we are asked to stop
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None:
+            continue
+        if stopping:
+            logger.info(f"Worker {index} (pid {pid}) stopped")
+        else:
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+            spawn(index)
+    sock.close()
+
 if __name__ == "__main__":
     # Add the current directory to Python path
     current_dir = os.path.dirname(os.path.abspath(__file__))
     sys.path.append(current_dir)
+
+    parser = argparse.ArgumentParser(description="AI Recommender FastAPI server")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('RECOMMENDER_WORKERS', 0)),
+                        help="Forked worker processes; 0 runs a single auto-reloading development server")
+    args = parser.parse_args()
     
     # Configuration
-    host = "0.0.0.0"
-    port = 8001
-    reload = True
+    host = args.host
+    port = args.port
+    workers = args.workers
+    reload = workers <= 0
     
     print(f"🚀 Starting AI Recommender FastAPI server...")
     print(f"📍 Server will be available at: http://{host}:{port}")
     print(f"🔗 API Documentation: http://{host}:{port}/docs")
     print(f"📊 Health Check: http://{host}:{port}/")
     print(f"🔄 Auto-reload: {'Enabled' if reload else 'Disabled'}")
+    if not reload:
+        print(f"👷 Workers: {workers} (models shared copy-on-write)")
     print(f"⏹️  Press Ctrl+C to stop the server")
     print("-" * 60)
     
@@ -44,9 +153,10 @@ if __name__ == "__main__":
             'description_vectorizer.joblib'
         ]
         
+        model_dir = os.environ.get('RECOMMENDER_MODEL_DIR', '.')
         missing_files = []
         for file in required_files:
-            if not os.path.exists(file):
+            if not os.path.exists(os.path.join(model_dir, file)):
                 missing_files.append(file)
         
         if missing_files:
@@ -57,6 +167,10 @@ if __name__ == "__main__":
         
         logger.info("All required model files found. Starting server...")
         
+        if not reload:
+            serve_prefork(host, port, workers)
+            sys.exit(0)
+
         uvicorn.run(
             "main:app",
             host=host,
@@ -0,0 +1,81 @@
+"""
+Distilled first-stage model for ranking the startup catalog.
+
+`BilinearSurrogate` approximates the compatibility model's log-odds as
+
+    intercept + a . zi + b . zs + zi^T M zs
+
+where zi and zs are the investor and startup halves of a feature row
+projected onto their top `rank` principal directions. For a fixed
+investor this is linear in zs, so once every catalog startup has been
+projected, ranking the whole catalog is one (startups x rank)
+matrix-vector product. train_model.py fits it on the compatibility
+model's own decision_function and saves it as compat_surrogate.joblib.
+"""
+
+import numpy as np
+
+
+def _principal_directions(X, rank):
+    """Top `rank` right singular vectors of centered X, as a (features, rank) matrix"""
+    mean = X.mean(axis=0)
+    _, _, vt = np.linalg.svd(X - mean, full_matrices=False)
+    directions = np.zeros((X.shape[1], rank))
+    directions[:, :min(rank, vt.shape[0])] = vt[:rank].T
+    return mean, directions
+
+
+class BilinearSurrogate:
+    """Low-rank bilinear approximation of a pair scoring model"""
+
+    def __init__(self, investor_width, rank=16, alpha=1.0):
+        self.investor_width = investor_width
+        self.rank = rank
+        self.alpha = alpha
+
+    def _design(self, zi, zs):
+        interactions = (zi[:, :, None] * zs[:, None, :]).reshape(len(zi), -1)
+        return np.hstack([zi, zs, interactions])
+
+    def fit(self, X, target):
+        """Ridge fit of `target` (the teacher's log-odds) on the projected pair features"""
+        X = np.asarray(X, dtype=np.float64)
+        target = np.asarray(target, dtype=np.float64)
+        self.n_features_in_ = X.shape[1]
+        self.investor_mean_, self.investor_directions_ = _principal_directions(X[:, :self.investor_width], self.rank)
+        self.startup_mean_, self.startup_directions_ = _principal_directions(X[:, self.investor_width:], self.rank)
+
+        design = self._design(self.project_investor(X[:, :self.investor_width]),
+                              self.project_startups(X[:, self.investor_width:]))
+        design_mean = design.mean(axis=0)
+        centered = design - design_mean
+        gram = centered.T @ centered + self.alpha * np.eye(design.shape[1])
+        coef = np.linalg.solve(gram, centered.T @ (target - target.mean()))
+
+        r = self.rank
+        self.investor_coef_ = coef[:r]
+        self.startup_coef_ = coef[r:2 * r]
+        self.interaction_ = coef[2 * r:].reshape(r, r)
+        self.intercept_ = float(target.mean() - design_mean @ coef)
+        return self
+
+    def project_investor(self, investor_rows):
+        return ((np.atleast_2d(investor_rows) - self.investor_mean_) @ self.investor_directions_).astype(np.float32)
+
+    def project_startups(self, startup_rows):
+        """(rows, rank) startup projections; the catalog keeps these precomputed"""
+        return ((np.atleast_2d(startup_rows) - self.startup_mean_) @ self.startup_directions_).astype(np.float32)
+
+    def startup_weights(self, investor_vec):
+        """(weights, offset) so that a startup's score is projected_startup @ weights + offset"""
+        zi = self.project_investor(investor_vec)[0]
+        weights = self.startup_coef_ + self.interaction_.T @ zi
+        return weights.astype(np.float32), self.intercept_ + float(self.investor_coef_ @ zi)
+
+    def decision_function(self, X):
+        """Approximate log-odds for full combined rows"""
+        X = np.asarray(X)
+        zi = self.project_investor(X[:, :self.investor_width])
+        zs = self.project_startups(X[:, self.investor_width:])
+        return self.intercept_ + zi @ self.investor_coef_ + zs @ self.startup_coef_ + np.einsum(
+            'ni,ij,nj->n', zi, self.interaction_, zs)
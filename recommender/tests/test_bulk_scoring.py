@@ -0,0 +1,21 @@
+import json
+
+from bulk_scoring import parse_pair
+from schemas import sample_investor, sample_startup
+
+
+def test_parse_pair_returns_the_parsed_pair():
+    line = json.dumps({"id": "p1", "investor": sample_investor().model_dump(), "startup": sample_startup().model_dump()})
+    index, pair_id, investor, startup = parse_pair(line, 3)
+    assert (index, pair_id) == (3, "p1")
+    assert investor == sample_investor() and startup == sample_startup()
+
+def test_parse_pair_error_echoes_the_id():
+    result = parse_pair(json.dumps({"id": "p2", "investor": {}, "startup": {}}), 4)
+    assert result["line"] == 4 and result["id"] == "p2"
+    assert result["error"].startswith("Invalid pair")
+
+def test_parse_pair_error_without_a_readable_id():
+    for line in ('{"investor": ', '[1, 2]', json.dumps({"investor": {}})):
+        result = parse_pair(line, 7)
+        assert result["line"] == 7 and "id" not in result and "error" in result
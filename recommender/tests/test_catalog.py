@@ -0,0 +1,31 @@
+import numpy as np
+
+from catalog import StartupCatalog
+
+
+def upsert(catalog, ids, value):
+    rows = np.full((len(ids), catalog.compat_width), value, dtype=np.float32)
+    return catalog.upsert(ids, rows, rows[:, :catalog.index_width], [{'id': i} for i in ids])
+
+def test_entries_since_returns_rows_written_after_a_sequence():
+    catalog = StartupCatalog(4, 2, initial_capacity=2)
+    upsert(catalog, ['a', 'b', 'c'], 1.0)
+    ids, records, compat, index, sequence = catalog.entries_since()
+    assert ids == ['a', 'b', 'c']
+    assert records == [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+    assert compat.shape == (3, 4) and index.shape == (3, 2)
+
+    upsert(catalog, ['b', 'd'], 2.0)
+    ids, _, compat, _, later = catalog.entries_since(sequence)
+    assert ids == ['b', 'd'] and later > sequence
+    np.testing.assert_array_equal(compat, 2.0)
+    assert catalog.entries_since(later)[0] == []
+
+def test_upsert_recomputes_projections_of_copied_rows():
+    source = StartupCatalog(4, 2)
+    upsert(source, ['a', 'b'], 3.0)
+    ids, records, compat, index, _ = source.entries_since()
+    target = StartupCatalog(4, 2, projections={'sum': (lambda rows: rows.sum(axis=1, keepdims=True), 1)})
+    target.upsert(ids, compat, index, records)
+    np.testing.assert_array_equal(target.projected_rows('sum'), [[12.0], [12.0]])
+    np.testing.assert_array_equal(target.entries_since()[2], compat)
@@ -0,0 +1,45 @@
+import numpy as np
+
+import entity_store
+from entity_store import EntityStore
+
+WIDTH = 3
+
+
+def vectorize(records):
+    return np.array([[record['value']] * WIDTH for record in records], dtype=np.float32)
+
+
+def open_store(directory, vectorized):
+    def counting_vectorize(records):
+        vectorized.extend(record['value'] for record in records)
+        return vectorize(records)
+    return EntityStore(str(directory), 'things', WIDTH, 'v1', counting_vectorize, initial_capacity=4)
+
+
+def upsert(store, values):
+    records = [{'value': float(value)} for value in values]
+    return store.upsert([f'id_{value}' for value in values], records, vectorize(records))
+
+
+def test_reopen_revectorizes_only_rows_after_the_last_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(entity_store, 'META_FLUSH_ROWS', 4)
+    store = open_store(tmp_path, [])
+    upsert(store, [0, 1, 2, 3, 4])  # reaches META_FLUSH_ROWS: meta written
+    upsert(store, [5, 6])
+
+    vectorized = []
+    reopened = open_store(tmp_path, vectorized)
+    assert vectorized == [5.0, 6.0]
+    vectors, known = reopened.lookup([f'id_{value}' for value in range(7)])
+    assert known.all()
+    np.testing.assert_array_equal(vectors[:, 0], np.arange(7))
+
+def test_flush_leaves_nothing_to_revectorize(tmp_path):
+    store = open_store(tmp_path, [])
+    upsert(store, [1, 2])
+    store.flush()
+
+    vectorized = []
+    open_store(tmp_path, vectorized)
+    assert vectorized == []
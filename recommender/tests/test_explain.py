@@ -0,0 +1,18 @@
+import numpy as np
+
+from explain import summarize
+
+LAYOUT = (np.array(['a.x', 'a.y', 'b.x', 'c.x']), np.array(['a', 'a', 'b', 'c']))
+
+
+def test_summarize_drops_blocks_that_cancel_out():
+    contributions = np.array([0.1 + 0.2, -0.3, 0.05, -0.5])  # block a sums to ~5.6e-17
+    summary = summarize(contributions, 0.25, LAYOUT)
+    assert summary["blocks"] == {"c": -0.5, "b": 0.05}
+    assert list(summary["blocks"]) == ["c", "b"]
+
+def test_summarize_drops_round_off_features():
+    contributions = np.array([1e-15, 0.0, 0.2, -0.4])
+    summary = summarize(contributions, 0.0, LAYOUT, top_n=3)
+    assert [feature["feature"] for feature in summary["top_features"]] == ["c.x", "b.x"]
+    assert "a" not in summary["blocks"]
@@ -0,0 +1,91 @@
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from features import (INVESTOR_FEATURES, vectorize_investor, vectorize_investor_frame, vectorize_startup_frame,
+                      vectorize_startups)
+from models import SuggestionEngine
+from schemas import InvestorInput, StartupInput
+
+SECTORS = ['Tech', 'Healthcare', 'Fintech', 'Consumer', 'Enterprise', 'AI/ML', 'CleanTech']
+STAGES = ['Pre-seed', 'Seed', 'Series A', 'Series B', 'Growth']
+WORDS = ['ai', 'software', 'health', 'climate', 'payments', 'data', 'retail', 'platform', 'growth', 'cloud']
+
+
+@pytest.fixture
+def frames():
+    """Investors and startups shaped like the generators in train_model.py"""
+    rng = np.random.default_rng(0)
+
+    def text():
+        return ' '.join(rng.choice(WORDS, 8))
+
+    investors = pd.DataFrame([{
+        'id': f'inv_{i}',
+        'name': f'Investor {i}',
+        'type': rng.choice(['VC', 'Angel', 'Corporate', 'PE']),
+        'avg_check_size': int(rng.integers(50, 500)) * 1000,
+        'preferred_sectors': list(rng.choice(SECTORS, int(rng.integers(1, 4)), replace=False)),
+        'preferred_stages': list(rng.choice(STAGES, int(rng.integers(1, 4)), replace=False)),
+        'min_roi': int(rng.integers(2, 10)),
+        'risk_appetite': int(rng.integers(1, 5)),
+        'years_active': int(rng.integers(1, 20)),
+        'thesis': text(),
+        'location': 'Chile',
+        'total_investments': int(rng.integers(5, 100))
+    } for i in range(40)])
+    startups = pd.DataFrame([{
+        'id': f'stp_{i}',
+        'name': f'Startup {i}',
+        'sector': rng.choice(SECTORS),
+        'stage': rng.choice(STAGES),
+        'founding_date': date(2022, 1, 1 + i % 28),
+        'employees': int(rng.integers(1, 200)),
+        'mrr': int(rng.integers(0, 500)) * 1000,
+        'growth_rate': float(rng.uniform(0, 2.0)),
+        'burn_rate': int(rng.integers(10, 100)) * 1000,
+        'funding_to_date': int(rng.integers(50, 5000)) * 1000,
+        'description': text(),
+        'location': 'Chile',
+        'last_valuation': int(rng.integers(1, 50)) * 1000000
+    } for i in range(60)])
+    models = SimpleNamespace(
+        thesis_vectorizer=TfidfVectorizer(max_features=50).fit(investors['thesis']),
+        description_vectorizer=TfidfVectorizer(max_features=50).fit(startups['description']),
+        startup_compat_features=249,
+        startup_traction_features=100
+    )
+    return investors, startups, models
+
+
+def test_investor_frame_matches_vectorize_investor(frames):
+    investors, _, models = frames
+    matrix = vectorize_investor_frame(investors, models)
+    assert matrix.shape == (len(investors), INVESTOR_FEATURES)
+    for row, record in enumerate(investors.to_dict('records')):
+        np.testing.assert_array_equal(matrix[row], vectorize_investor(InvestorInput(**record), models))
+
+def test_startup_frame_matches_vectorize_startups(frames):
+    _, startups, models = frames
+    compat, traction = vectorize_startup_frame(startups, models)
+    records = [dict(record, founding_date=str(record['founding_date'])) for record in startups.to_dict('records')]
+    expected_compat, expected_traction = vectorize_startups([StartupInput(**record) for record in records], models)
+    np.testing.assert_array_equal(compat, expected_compat)
+    np.testing.assert_array_equal(traction, expected_traction)
+
+def test_suggestion_engine_is_trained_on_serving_vectors(frames):
+    """The engine sees at training time the same investor rows /novel_suggestions/ sends it"""
+    investors, startups, models = frames
+    investor_matrix = vectorize_investor_frame(investors, models)
+    startup_matrix, _ = vectorize_startup_frame(startups, models)
+    engine = SuggestionEngine()
+    engine.train(investor_matrix, startup_matrix, startups['id'].values)
+
+    served = vectorize_investor(InvestorInput(**investors.to_dict('records')[3]), models)
+    assert engine.n_investor_features_ == len(served) == INVESTOR_FEATURES
+    np.testing.assert_allclose(engine.investor_pca.transform(served.reshape(1, -1)),
+                               engine.investor_pca.transform(investor_matrix[3:4]))
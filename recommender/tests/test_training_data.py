@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from training_data import create_labeled_dataset, create_sequences
+
+
+def loop_labeled_dataset(investors_df, startups_df, investor_features, startup_features, interactions):
+    """The original row-by-row implementation of create_labeled_dataset"""
+    positives = interactions[interactions['interacted'] == 1]
+    negatives = interactions[interactions['interacted'] == 0].sample(len(positives))
+    labeled = pd.concat([positives, negatives]).sample(frac=1).reset_index(drop=True)
+    labeled = labeled.merge(investors_df[['id']], left_on='investor_id', right_on='id', suffixes=('', '_inv_orig')).drop('id', axis=1)
+    labeled = labeled.merge(startups_df[['id']], left_on='startup_id', right_on='id', suffixes=('', '_stp_orig')).drop('id', axis=1)
+    X = []
+    for _, row in labeled.iterrows():
+        inv_features = investor_features.loc[investors_df[investors_df['id'] == row['investor_id']].index].iloc[0]
+        stp_features = startup_features.loc[startups_df[startups_df['id'] == row['startup_id']].index].iloc[0]
+        X.append(np.concatenate([inv_features.values, stp_features.values]))
+    return np.array(X), labeled['interacted'].values
+
+def loop_sequences(investors, interactions, startups, seq_length=5):
+    """The original per-investor loop of create_sequences, with a stable date sort"""
+    sequences, labels = [], []
+    for investor in investors['id'].unique():
+        inv_interactions = interactions[interactions['investor_id'] == investor].sort_values('date', kind='stable')
+        preferences = investors[investors['id'] == investor]
+        for i in range(len(inv_interactions) - seq_length):
+            seq_features = []
+            for _, row in inv_interactions.iloc[i:i + seq_length].iterrows():
+                startup = startups[startups['id'] == row['startup_id']].iloc[0]
+                seq_features.append([
+                    1 if startup['sector'] in preferences['preferred_sectors'].values[0] else 0,
+                    1 if startup['stage'] in preferences['preferred_stages'].values[0] else 0,
+                    startup['mrr'] / 1e6 if not np.isnan(startup['mrr']) else 0,
+                    startup['growth_rate'],
+                    row['interacted']
+                ])
+            sequences.append(seq_features)
+            labels.append(inv_interactions.iloc[i + seq_length]['interacted'])
+    return np.array(sequences), np.array(labels)
+
+
+@pytest.fixture
+def training_frames():
+    rng = np.random.default_rng(0)
+    investors = pd.DataFrame({'id': [f'inv_{i}' for i in range(20)]})
+    startups = pd.DataFrame({'id': [f'stp_{i}' for i in range(30)]})
+    # A repeated startup ID: the first row's features are used
+    startups.loc[29, 'id'] = 'stp_3'
+    investor_features = pd.DataFrame(rng.normal(size=(20, 6)))
+    startup_features = pd.DataFrame(rng.normal(size=(30, 4)))
+    interactions = pd.DataFrame({
+        'investor_id': rng.choice(investors['id'], 300),
+        'startup_id': rng.choice(startups['id'].unique(), 300),
+        'interacted': rng.integers(0, 2, 300)
+    })
+    return investors, startups, investor_features, startup_features, interactions
+
+
+def test_labeled_dataset_matches_row_loop(training_frames):
+    np.random.seed(0)
+    X, y = create_labeled_dataset(*training_frames)
+    np.random.seed(0)
+    expected_X, expected_y = loop_labeled_dataset(*training_frames)
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X, expected_X.astype(np.float32))
+    np.testing.assert_array_equal(y, expected_y)
+
+def test_labeled_dataset_rejects_ids_without_features(training_frames):
+    investors, startups, investor_features, startup_features, interactions = training_frames
+    with pytest.raises(KeyError):
+        create_labeled_dataset(investors, startups, investor_features.iloc[:10], startup_features, interactions)
+
+@pytest.fixture
+def history_frames():
+    rng = np.random.default_rng(1)
+    sectors, stages = ['Tech', 'Fintech', 'Healthcare'], ['Seed', 'Series A']
+    investors = pd.DataFrame({
+        'id': [f'inv_{i}' for i in range(8)],
+        'preferred_sectors': [list(rng.choice(sectors, 2, replace=False)) for _ in range(8)],
+        'preferred_stages': [list(rng.choice(stages, 1)) for _ in range(8)]
+    })
+    startups = pd.DataFrame({
+        'id': [f'stp_{i}' for i in range(15)],
+        'sector': rng.choice(sectors, 15),
+        'stage': rng.choice(stages, 15),
+        'mrr': rng.integers(0, 500, 15) * 1000.0,
+        'growth_rate': rng.uniform(0, 2, 15)
+    })
+    startups.loc[4, 'mrr'] = np.nan
+    # Few distinct dates, so most investors have several interactions on one day
+    interactions = pd.DataFrame({
+        'investor_id': rng.choice(investors['id'].tolist() + ['inv_unknown'], 200),
+        'startup_id': rng.choice(startups['id'], 200),
+        'interacted': rng.integers(0, 2, 200),
+        'date': pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 4, 200), unit='D')
+    })
+    return investors, interactions, startups
+
+
+@pytest.mark.parametrize('seq_length', [1, 5])
+def test_sequences_match_investor_loop(history_frames, seq_length):
+    sequences, labels = create_sequences(*history_frames, seq_length=seq_length)
+    expected_sequences, expected_labels = loop_sequences(*history_frames, seq_length=seq_length)
+    assert sequences.shape == (len(expected_labels), seq_length, 5)
+    np.testing.assert_allclose(sequences, expected_sequences.astype(np.float32))
+    np.testing.assert_array_equal(labels, expected_labels)
+
+def test_sequences_written_to_memmap(history_frames, tmp_path):
+    sequences, _ = create_sequences(*history_frames, out_path=tmp_path / 'sequences.npy')
+    np.testing.assert_array_equal(np.load(tmp_path / 'sequences.npy'), sequences)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+
+from model_registry import COMPILED_MAX_BATCH
+from tree_engine import CompiledTreeEnsemble
+
+N_FEATURES = 30
+
+
+@pytest.fixture(scope='module')
+def model():
+    """Small ensemble over mixed continuous and one-hot columns, like the compatibility model"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, N_FEATURES)).astype(np.float32)
+    X[:, :5] = rng.integers(0, 2, size=(600, 5))
+    y = (X[:, 0] + X[:, 5] * X[:, 6] + rng.normal(scale=0.5, size=600) > 0.5).astype(int)
+    return GradientBoostingClassifier(n_estimators=40, max_depth=4, random_state=0).fit(X, y)
+
+
+@pytest.mark.parametrize('n_rows', [1, 2, COMPILED_MAX_BATCH - 1, COMPILED_MAX_BATCH, COMPILED_MAX_BATCH + 1, 1000])
+def test_predict_proba_matches_sklearn(model, n_rows):
+    X = np.random.default_rng(n_rows).normal(size=(n_rows, N_FEATURES)).astype(np.float32)
+    np.testing.assert_array_equal(CompiledTreeEnsemble(model).predict_proba(X), model.predict_proba(X))
+
+def test_rows_on_split_thresholds_match_sklearn(model):
+    """Values equal to a threshold (as float32) go left in both evaluators"""
+    engine = CompiledTreeEnsemble(model)
+    internal = engine.left != np.arange(len(engine.left))  # leaves point back to themselves
+    splits, thresholds = engine.feature[internal], engine.threshold[internal]
+    X = np.zeros((len(splits), N_FEATURES), dtype=np.float32)
+    X[np.arange(len(splits)), splits] = thresholds
+    np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(X))
+
+def test_single_row_vector(model):
+    row = np.random.default_rng(1).normal(size=N_FEATURES).astype(np.float32)
+    np.testing.assert_array_equal(CompiledTreeEnsemble(model).predict_proba(row), model.predict_proba(row[None, :]))
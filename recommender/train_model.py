@@ -162,34 +162,8 @@ def preprocess_startups(startups):
     startup_features = pd.concat([startup_features, desc_df], axis=1)
     return startup_features, description_vectorizer
 
-# Create labeled dataset for compatibility model
-def create_labeled_dataset(investors_df, startups_df, investor_features, startup_features, interactions):
-    # Get positive and negative examples
-    positives = interactions[interactions['interacted'] == 1]
-    negatives = interactions[interactions['interacted'] == 0].sample(len(positives))
-
-    # Combine and shuffle
-    labeled = pd.concat([positives, negatives]).sample(frac=1).reset_index(drop=True)
-
-    # Merge with original dataframes to get IDs
-    labeled = labeled.merge(investors_df[['id']], left_on='investor_id', right_on='id', suffixes=('', '_inv_orig')).drop('id', axis=1)
-    labeled = labeled.merge(startups_df[['id']], left_on='startup_id', right_on='id', suffixes=('', '_stp_orig')).drop('id', axis=1)
-
-    # Create features and labels
-    X = []
-    for index, row in labeled.iterrows():
-        # Get features from preprocessed dataframes using original IDs
-        inv_id = row['investor_id']
-        stp_id = row['startup_id']
-
-        inv_features = investor_features.loc[investors_df[investors_df['id'] == inv_id].index].iloc[0]
-        stp_features = startup_features.loc[startups_df[startups_df['id'] == stp_id].index].iloc[0]
-
-        combined = np.concatenate([inv_features.values, stp_features.values])
-        X.append(combined)
-
-    y = labeled['interacted'].values
-    return np.array(X), y
+# Create labeled dataset for compatibility model (see training_data.py)
+from training_data import create_labeled_dataset
 
 # Preprocess all data
 investor_features, thesis_vectorizer = preprocess_investors(investors_df)
@@ -223,6 +197,67 @@ compat_model = CompatibilityModel()
 compat_model.train(X_train, y_train)
 compat_model.evaluate(X_test, y_test)
 
+# Distill compat_model into a cheap first-stage ranker (see surrogate.py).
+# The teacher's log-odds are fitted over the interaction pairs and random
+# investor x startup pairs, the same kind of rows the first pass of
+# /recommend/{k} scores. The rows are built by the service's own
+# vectorizers (features.py), whose layout differs from the get_dummies
+# layout above, so the surrogate is fitted on what it will be sent.
+import time
+from types import SimpleNamespace
+from features import INVESTOR_FEATURES, vectorize_investor_frame, vectorize_startup_frame
+from surrogate import BilinearSurrogate
+
+serving_models = SimpleNamespace(
+    thesis_vectorizer=thesis_vectorizer,
+    description_vectorizer=description_vectorizer,
+    startup_compat_features=X.shape[1] - INVESTOR_FEATURES,
+    startup_traction_features=startup_features.shape[1]
+)
+
+def pair_rows(investor_matrix, startup_matrix, inv_rows, stp_rows):
+    return np.hstack([investor_matrix[inv_rows], startup_matrix[stp_rows]]).astype(np.float32)
+
+def sample_pairs(investor_matrix, startup_matrix, n, rng):
+    return pair_rows(investor_matrix, startup_matrix,
+                     rng.integers(0, len(investor_matrix), n), rng.integers(0, len(startup_matrix), n))
+
+def cascade_recall(teacher, surrogate, investor_matrix, startup_matrix, k=10, candidates=200, n_investors=50):
+    """Mean recall@k of surrogate shortlist + teacher re-rank vs. teacher over all startups, with latencies"""
+    recalls, full_seconds, cascade_seconds = [], 0.0, 0.0
+    projected = surrogate.project_startups(startup_matrix)
+    for investor_vec in investor_matrix[:n_investors]:
+        pairs = np.hstack([np.tile(investor_vec, (len(startup_matrix), 1)), startup_matrix]).astype(np.float32)
+        started = time.perf_counter()
+        full_top = np.argsort(-teacher.predict_proba(pairs)[:, 1], kind='stable')[:k]
+        full_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        weights, _ = surrogate.startup_weights(investor_vec)
+        shortlist = np.argpartition(-(projected @ weights), min(candidates, len(projected)) - 1)[:candidates]
+        rescored = teacher.predict_proba(pairs[shortlist])[:, 1]
+        cascade_top = shortlist[np.argsort(-rescored, kind='stable')[:k]]
+        cascade_seconds += time.perf_counter() - started
+        recalls.append(len(np.intersect1d(full_top, cascade_top)) / k)
+    n = min(n_investors, len(investor_matrix))
+    return float(np.mean(recalls)), full_seconds / n * 1000, cascade_seconds / n * 1000
+
+investor_matrix = vectorize_investor_frame(investors_df, serving_models)
+startup_matrix, _ = vectorize_startup_frame(startups_df, serving_models)
+interaction_pairs = pair_rows(investor_matrix, startup_matrix,
+                              pd.Index(investors_df['id']).get_indexer(interactions_df['investor_id']),
+                              pd.Index(startups_df['id']).get_indexer(interactions_df['startup_id']))
+rng = np.random.default_rng(42)
+distill_X = np.vstack([interaction_pairs, sample_pairs(investor_matrix, startup_matrix, 50000, rng)])
+compat_surrogate = BilinearSurrogate(investor_width=INVESTOR_FEATURES, rank=16)
+compat_surrogate.fit(distill_X, compat_model.model.decision_function(distill_X))
+holdout_X = sample_pairs(investor_matrix, startup_matrix, 5000, rng)
+fidelity = np.corrcoef(compat_model.model.decision_function(holdout_X), compat_surrogate.decision_function(holdout_X))[0, 1]
+recall, full_ms, cascade_ms = cascade_recall(compat_model.model, compat_surrogate, investor_matrix, startup_matrix)
+print(f"Surrogate log-odds correlation with compat_model: {fidelity:.3f}")
+print(f"Cascade recall@10 (200 candidates of {len(startup_matrix)}): {recall:.3f}, "
+      f"{full_ms:.1f}ms full scoring vs {cascade_ms:.1f}ms cascade per investor")
+
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
@@ -246,38 +281,11 @@ class InvestmentHistoryModel:
     def predict(self, X):
         return self.model.predict(X).flatten()
 
-# Create sequential investment history data
-def create_sequences(investors, interactions, seq_length=5):
-    sequences = []
-    labels = []
-
-    for investor in investors['id'].unique():
-        inv_interactions = interactions[interactions['investor_id'] == investor].sort_values('date')
-
-        for i in range(len(inv_interactions) - seq_length):
-            seq = inv_interactions.iloc[i:i+seq_length]
-            next_interaction = inv_interactions.iloc[i+seq_length]
-
-            # Get features for each interaction in sequence
-            seq_features = []
-            for _, row in seq.iterrows():
-                startup = startups_df[startups_df['id'] == row['startup_id']].iloc[0]
-                features = [
-                    1 if startup['sector'] in investors[investors['id'] == investor]['preferred_sectors'].values[0] else 0,
-                    1 if startup['stage'] in investors[investors['id'] == investor]['preferred_stages'].values[0] else 0,
-                    startup['mrr'] / 1e6 if not np.isnan(startup['mrr']) else 0,
-                    startup['growth_rate'],
-                    row['interacted']
-                ]
-                seq_features.append(features)
-
-            sequences.append(seq_features)
-            labels.append(next_interaction['interacted'])
-
-    return np.array(sequences), np.array(labels)
+# Create sequential investment history data (see training_data.py)
+from training_data import create_sequences
 
 # Prepare sequence data
-sequences, seq_labels = create_sequences(investors_df, interactions_df)
+sequences, seq_labels = create_sequences(investors_df, interactions_df, startups_df)
 X_seq_train, X_seq_test, y_seq_train, y_seq_test = train_test_split(sequences, seq_labels, test_size=0.2, random_state=42)
 
 # Train history model
@@ -323,37 +331,18 @@ traction_model = TractionModel()
 traction_model.train(X_trac_train, y_trac_train)
 traction_model.evaluate(X_trac_test, y_trac_test)
 
-import networkx as nx
 from node2vec import Node2Vec
+from sector_graph import build_sector_graph
 
 class IndustryCompatibilityModel:
     def __init__(self):
         self.graph = None
         self.model = None
 
-    def build_graph(self, startups):
-        G = nx.Graph()
-
-        # Add nodes (sectors)
-        all_sectors = startups['sector'].unique()
-        for sector in all_sectors:
-            G.add_node(sector)
-
-        # Add edges based on co-occurrence in investor preferences
-        investor_sectors = investors_df['preferred_sectors'].explode().value_counts()
-        for sector1 in all_sectors:
-            for sector2 in all_sectors:
-                if sector1 != sector2:
-                    # Simple co-occurrence weight
-                    weight = 0
-                    for _, inv in investors_df.iterrows():
-                        if sector1 in inv['preferred_sectors'] and sector2 in inv['preferred_sectors']:
-                            weight += 1
-                    if weight > 0:
-                        G.add_edge(sector1, sector2, weight=weight)
-
-        self.graph = G
-        return G
+    def build_graph(self, startups, investors):
+        # Sectors are the nodes, edges weighted by investor co-occurrence
+        self.graph = build_sector_graph(startups['sector'].unique(), investors['preferred_sectors'])
+        return self.graph
 
     def train_embeddings(self, dimensions=8):
         # Generate walks
@@ -372,7 +361,7 @@ class IndustryCompatibilityModel:
 
 # Train industry model
 industry_model = IndustryCompatibilityModel()
-industry_model.build_graph(startups_df)
+industry_model.build_graph(startups_df, investors_df)
 industry_model.train_embeddings()
 
 # Example usage
@@ -382,133 +371,18 @@ print(f"Tech-Healthcare compatibility: {industry_model.get_sector_similarity('Te
 
 
 
-import networkx as nx
-from node2vec import Node2Vec
-
-class IndustryCompatibilityModel:
-    def __init__(self):
-        self.graph = None
-        self.model = None
-
-    def build_graph(self, startups):
-        G = nx.Graph()
-
-        # Add nodes (sectors)
-        all_sectors = startups['sector'].unique()
-        for sector in all_sectors:
-            G.add_node(sector)
-
-        # Add edges based on co-occurrence in investor preferences
-        investor_sectors = investors_df['preferred_sectors'].explode().value_counts()
-        for sector1 in all_sectors:
-            for sector2 in all_sectors:
-                if sector1 != sector2:
-                    # Simple co-occurrence weight
-                    weight = 0
-                    for _, inv in investors_df.iterrows():
-                        if sector1 in inv['preferred_sectors'] and sector2 in inv['preferred_sectors']:
-                            weight += 1
-                    if weight > 0:
-                        G.add_edge(sector1, sector2, weight=weight)
-
-        self.graph = G
-        return G
-
-    def train_embeddings(self, dimensions=8):
-        # Generate walks
-        node2vec = Node2Vec(self.graph, dimensions=dimensions, walk_length=10, num_walks=100, workers=4)
-
-        # Learn embeddings
-        self.model = node2vec.fit(window=10, min_count=1)
-        return self.model
-
-    def get_sector_similarity(self, sector1, sector2):
-        if sector1 not in self.model.wv or sector2 not in self.model.wv:
-            return 0.5  # Default neutral score
-
-        # Cosine similarity between sector embeddings
-        return (1 + self.model.wv.similarity(sector1, sector2)) / 2  # Scale to 0-1
-
-# Train industry model
-industry_model = IndustryCompatibilityModel()
-industry_model.build_graph(startups_df)
-industry_model.train_embeddings()
-
-# Example usage
-print(f"Tech-Fintech compatibility: {industry_model.get_sector_similarity('Tech', 'Fintech'):.2f}")
-print(f"Tech-Healthcare compatibility: {industry_model.get_sector_similarity('Tech', 'Healthcare'):.2f}")
-
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.neighbors import NearestNeighbors
-import numpy as np
+from models import SuggestionEngine
 
-class SuggestionEngine:
-    def __init__(self):
-        self.investor_pca = PCA(n_components=8)
-        self.startup_pca = PCA(n_components=8)
-        self.startup_cluster = KMeans(n_clusters=10, random_state=42, n_init=10) # Added n_init for KMeans
-        self.startup_nn = NearestNeighbors(n_neighbors=5)
-
-    def train(self, investor_features, startup_features):
-        # Train PCA separately for investor and startup features
-        self.investor_pca.fit(investor_features)
-        investor_reduced = self.investor_pca.transform(investor_features)
-
-        self.startup_pca.fit(startup_features)
-        startup_reduced = self.startup_pca.transform(startup_features)
-
-        # Cluster and fit nearest neighbors on startup features in PCA space
-        self.startup_cluster.fit(startup_reduced)
-        self.startup_nn.fit(startup_reduced)
-
-    def get_novel_suggestions(self, investor_vec, startup_vecs, startup_ids, n=5):
-        # Transform to PCA space
-        investor_pca = self.investor_pca.transform(investor_vec.reshape(1, -1))
-        startup_pcas = self.startup_pca.transform(startup_vecs)
-
-        # Find distance to nearest cluster center for each startup
-        cluster_dists = []
-        for vec in startup_pcas:
-            # Predict cluster for the current startup vector
-            cluster_label = self.startup_cluster.predict(vec.reshape(1, -1))[0]
-            # Get the centroid of the predicted cluster
-            centroid = self.startup_cluster.cluster_centers_[cluster_label]
-            # Calculate distance from the startup vector to its cluster centroid
-            dist = np.linalg.norm(vec - centroid)
-            cluster_dists.append(dist)
-
-        # Find startups far from investor in their respective PCA feature spaces
-        # Calculate distance between investor_pca and each startup_pca
-        investor_dist = np.linalg.norm(startup_pcas - investor_pca, axis=1)
-
-        # Combine scores (higher is more novel)
-        # Using a weighted sum of distance to cluster centroid and distance from investor
-        # The weights can be tuned based on desired balance between diversity and investor fit
-        novelty_scores = 0.6 * np.array(cluster_dists) + 0.4 * investor_dist
-
-        # Get top novel startups
-        novel_indices = np.argsort(-novelty_scores)[:n]
-        # Return the IDs of the novel startups and their scores
-        return [startup_ids[i] for i in novel_indices], novelty_scores[novel_indices]
-
-
-# Train suggestion engine
+# Train suggestion engine on the serving vectors (vectorize_investor and the
+# compat half of vectorize_startups, as built for the surrogate above), so
+# /novel_suggestions/ queries it with rows it was fitted on
 suggestion_engine = SuggestionEngine()
-suggestion_engine.train(investor_features.values, startup_features.values)
-
-# Example of getting novel suggestions for a specific investor (e.g., the first investor)
-# Need to pass investor_features and startup_features as numpy arrays or similar
-# Also need startup_ids to return meaningful suggestions
-investor_index_to_suggest = 0 # Example: Suggest for the first investor
-investor_vector_for_suggestion = investor_features.iloc[investor_index_to_suggest].values
-startup_vectors_for_suggestion = startup_features.values
-startup_ids_for_suggestion = startups_df['id'].values # Assuming startups_df is available
+suggestion_engine.train(investor_matrix, startup_matrix, startups_df['id'].values)
 
+# Example: novel suggestions for the first investor from the cached training catalog
+investor_index_to_suggest = 0
 novel_startup_indices, novelty_scores = suggestion_engine.get_novel_suggestions(
-    investor_vector_for_suggestion,
-    startup_vectors_for_suggestion,
-    startup_ids_for_suggestion,
+    investor_matrix[investor_index_to_suggest],
     n=5
 )
 
@@ -521,9 +395,11 @@ import joblib
 print("Saving models and vectorizers...")
 # Save your models (just the internal sklearn models)
 joblib.dump(compat_model.model, 'compatibility_model.joblib')
+joblib.dump(compat_surrogate, 'compat_surrogate.joblib')
 joblib.dump(history_model.model, 'history_model.joblib')
 joblib.dump(traction_model.model, 'traction_model.joblib')
 joblib.dump(industry_model.model, 'industry_model.joblib')
+joblib.dump(suggestion_engine, 'suggestion_engine.joblib')
 
 # Save vectorizers
 joblib.dump(thesis_vectorizer, 'thesis_vectorizer.joblib')
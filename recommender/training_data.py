@@ -0,0 +1,117 @@
+"""
+Training-set construction for train_model.py.
+
+Kept out of the training script so it can be imported (and tested)
+without generating data and training every model.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows gathered per step, so the temporaries stay small for very large datasets
+GATHER_CHUNK_ROWS = 1_000_000
+
+def feature_rows_for(entities_df, features_df, ids):
+    """Position in features_df of the first entities_df row with each ID"""
+    first = entities_df.drop_duplicates('id')
+    labels = pd.Series(first.index, index=first['id']).reindex(ids).to_numpy()
+    rows = features_df.index.get_indexer(labels)
+    if (rows < 0).any():
+        raise KeyError(f"{int((rows < 0).sum())} interactions reference IDs without features")
+    return rows
+
+def create_labeled_dataset(investors_df, startups_df, investor_features, startup_features, interactions):
+    """(X, y): positive interactions and as many sampled negatives, shuffled, as float32 feature pairs"""
+    # Get positive and negative examples
+    positives = interactions[interactions['interacted'] == 1]
+    negatives = interactions[interactions['interacted'] == 0].sample(len(positives))
+
+    # Combine and shuffle
+    labeled = pd.concat([positives, negatives]).sample(frac=1).reset_index(drop=True)
+
+    # Merge with original dataframes to get IDs
+    labeled = labeled.merge(investors_df[['id']], left_on='investor_id', right_on='id', suffixes=('', '_inv_orig')).drop('id', axis=1)
+    labeled = labeled.merge(startups_df[['id']], left_on='startup_id', right_on='id', suffixes=('', '_stp_orig')).drop('id', axis=1)
+
+    # Create features and labels: map IDs to feature rows once, then gather
+    # each side into a preallocated matrix (the first row wins for repeated IDs)
+    inv_rows = feature_rows_for(investors_df, investor_features, labeled['investor_id'])
+    stp_rows = feature_rows_for(startups_df, startup_features, labeled['startup_id'])
+    inv_matrix = investor_features.to_numpy(dtype=np.float32)
+    stp_matrix = startup_features.to_numpy(dtype=np.float32)
+
+    X = np.empty((len(labeled), inv_matrix.shape[1] + stp_matrix.shape[1]), dtype=np.float32)
+    for start in range(0, len(labeled), GATHER_CHUNK_ROWS):
+        stop = start + GATHER_CHUNK_ROWS
+        X[start:stop, :inv_matrix.shape[1]] = inv_matrix[inv_rows[start:stop]]
+        X[start:stop, inv_matrix.shape[1]:] = stp_matrix[stp_rows[start:stop]]
+
+    y = labeled['interacted'].values
+    return X, y
+
+SEQUENCE_FEATURES = 5
+SEQUENCE_CHUNK_WINDOWS = 1_000_000
+
+def first_positions(entities_df, ids):
+    """Row position of the first entities_df row with each ID (-1 if missing)"""
+    first = entities_df['id'].reset_index(drop=True).drop_duplicates()
+    return pd.Series(first.index, index=first.values).reindex(ids).fillna(-1).to_numpy(np.intp)
+
+def interaction_feature_rows(investors, startups, inv_pos, stp_pos, interacted):
+    """(n, 5) rows of [sector match, stage match, MRR in millions, growth rate, interacted]"""
+    rows = np.empty((len(inv_pos), SEQUENCE_FEATURES), dtype=np.float32)
+    for column, preference, key in ((0, 'preferred_sectors', 'sector'), (1, 'preferred_stages', 'stage')):
+        # (investor, category) pairs as single integers, matched with one isin
+        categories = pd.Index(startups[key].unique())
+        startup_codes = categories.get_indexer(startups[key])
+        preferred = investors[preference].reset_index(drop=True).explode()
+        preferred_codes = categories.get_indexer(preferred.values)
+        known = preferred_codes >= 0
+        preferred_pairs = preferred.index.values[known].astype(np.int64) * len(categories) + preferred_codes[known]
+        rows[:, column] = np.isin(inv_pos.astype(np.int64) * len(categories) + startup_codes[stp_pos], preferred_pairs)
+    mrr = startups['mrr'].to_numpy(dtype=np.float64)[stp_pos]
+    rows[:, 2] = np.where(np.isnan(mrr), 0.0, mrr / 1e6)
+    rows[:, 3] = startups['growth_rate'].to_numpy(dtype=np.float64)[stp_pos]
+    rows[:, 4] = interacted
+    return rows
+
+def create_sequences(investors, interactions, startups, seq_length=5, out_path=None):
+    """Every window of seq_length consecutive interactions of an investor, labeled with the next one.
+
+    Feature rows are computed once per interaction, ordered by investor
+    (in `investors` order) and date with a stable sort, and the windows
+    are strided views over them, copied into one (n_windows, seq_length, 5)
+    float32 array. With `out_path` that array is a .npy memmap on disk.
+    """
+    inv_pos = first_positions(investors, interactions['investor_id'])
+    stp_pos = first_positions(startups, interactions['startup_id'])
+    keep = inv_pos >= 0
+    if (stp_pos[keep] < 0).any():
+        raise KeyError(f"{int((stp_pos[keep] < 0).sum())} interactions reference unknown startups")
+    interacted = interactions['interacted'].to_numpy()[keep]
+    dates = pd.to_datetime(interactions['date']).to_numpy()[keep]
+    inv_pos, stp_pos = inv_pos[keep], stp_pos[keep]
+
+    # Stable sorts by date, then investor: interactions of one investor on
+    # the same date keep their order in `interactions`
+    order = np.argsort(dates, kind='stable')
+    order = order[np.argsort(inv_pos[order], kind='stable')]
+    inv_pos, stp_pos, interacted = inv_pos[order], stp_pos[order], interacted[order]
+    rows = interaction_feature_rows(investors, startups, inv_pos, stp_pos, interacted)
+
+    # A window may start at any interaction followed by seq_length more of
+    # the same investor; rows are grouped, so checking the label row suffices
+    starts = np.flatnonzero(inv_pos[:-seq_length] == inv_pos[seq_length:])
+
+    shape = (len(starts), seq_length, SEQUENCE_FEATURES)
+    if out_path is not None:
+        sequences = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=shape)
+    else:
+        sequences = np.empty(shape, dtype=np.float32)
+    if len(starts):
+        windows = np.lib.stride_tricks.sliding_window_view(rows, seq_length, axis=0).transpose(0, 2, 1)
+        for begin in range(0, len(starts), SEQUENCE_CHUNK_WINDOWS):
+            chunk = starts[begin:begin + SEQUENCE_CHUNK_WINDOWS]
+            sequences[begin:begin + len(chunk)] = windows[chunk]
+    labels = interacted[starts + seq_length]
+    return sequences, labels